@@ -0,0 +1,161 @@
+"""Backend
+
+Description:
+    This module defines the interface shared by the SAT solvers and a
+    backend that runs any DIMACS-compatible solver binary in a separate
+    process
+
+License:
+    Copyright 2021 Debby Nirwan
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+from planning_sat.budget import Budget, UNKNOWN
+from planning_sat.dimacs import dump_dimacs
+from planning_sat.encoder import intern_formulas
+from abc import ABC, abstractmethod
+from itertools import chain
+from typing import Iterable, List, Optional, Sequence, Set, Tuple, Union
+import os
+import shlex
+import subprocess
+import tempfile
+
+
+class SolverBackend(ABC):
+    """What the planning pipeline expects from a solver.
+
+    Calling a backend with formulas, either Clause objects or integer
+    clauses, an optional partial model that must hold and an optional
+    Budget returns (True, model), (False, None) or (UNKNOWN, None) when
+    the budget ran out first. DavisPutnam, CDCL, Portfolio,
+    CubeAndConquer and ExternalSolver all implement it.
+
+    A model may be partial: it satisfies the formulas whatever the values
+    of the variables it does not list. DavisPutnam returns the literals
+    it assigned, which can leave such free variables out.
+
+    Subclasses implement _solve(), which gets integer clauses, the model
+    as integer literals and the budget, already started.
+    """
+
+    def __call__(self, formulas: List, model=None,
+                 budget: Budget = None) -> Tuple[Optional[bool],
+                                                 Optional[Set]]:
+        # Clause objects are interned to signed integer literals once, the
+        # search itself only ever compares and negates integers
+        formulas, model, pool = intern_formulas(formulas, model)
+
+        if budget is not None:
+            budget.start()
+        sat, model = self._solve(formulas, model or (), budget)
+        if sat and pool is not None:
+            return sat, pool.decode(model)
+        return sat, model
+
+    @abstractmethod
+    def _solve(self, formulas: Sequence[List[int]], model: Iterable[int],
+               budget: Optional[Budget]) -> Tuple[Optional[bool],
+                                                  Optional[Set[int]]]:
+        ...
+
+
+class ExternalSolver(SolverBackend):
+    """Runs a DIMACS solver binary, e.g. ExternalSolver('kissat -q').
+
+    The formulas are streamed to a temporary DIMACS file that is passed
+    to the command as its last argument, or fed to its standard input
+    with stdin=True. The answer is read from the 's' and 'v' lines of the
+    output in the format of the SAT competitions, falling back on the
+    exit codes 10 (satisfiable) and 20 (unsatisfiable). Variables missing
+    from the 'v' lines are taken as false.
+
+    A budget bounds the time and can cancel the solver, which is then
+    killed; its conflict and decision limits are not used.
+    """
+
+    def __init__(self, command: Union[str, Sequence[str]], stdin=False,
+                 poll_interval=0.05):
+        if isinstance(command, str):
+            command = shlex.split(command)
+        self._command = list(command)
+        self._stdin = stdin
+        self._poll_interval = poll_interval
+
+    def _solve(self, formulas: List[List[int]], model, budget: Budget):
+        num_vars = max((abs(literal) for clause in formulas
+                        for literal in clause), default=0)
+        num_vars = max(num_vars, max((abs(literal) for literal in model),
+                                     default=0))
+
+        descriptor, path = tempfile.mkstemp(suffix='.cnf')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='ascii') as cnf:
+                # the model as unit clauses, streamed after the formulas
+                dump_dimacs(cnf, chain(formulas,
+                                       ([literal] for literal in model)),
+                            num_vars, num_clauses=len(formulas) + len(model))
+            output, returncode = self._run(path, budget)
+        finally:
+            os.remove(path)
+        if output is None:
+            return UNKNOWN, None
+        return self._parse(output, returncode, num_vars)
+
+    def _run(self, path: str, budget: Budget):
+        with open(path, encoding='ascii') as cnf:
+            if self._stdin:
+                process = subprocess.Popen(self._command, stdin=cnf,
+                                           stdout=subprocess.PIPE,
+                                           universal_newlines=True)
+            else:
+                process = subprocess.Popen(self._command + [path],
+                                           stdin=subprocess.DEVNULL,
+                                           stdout=subprocess.PIPE,
+                                           universal_newlines=True)
+            try:
+                while True:
+                    try:
+                        output, _ = process.communicate(
+                            timeout=self._poll_interval)
+                        return output, process.returncode
+                    except subprocess.TimeoutExpired:
+                        if budget is not None and budget.exhausted(0, 0):
+                            return None, None
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    process.communicate()
+
+    @staticmethod
+    def _parse(output: str, returncode: int, num_vars: int):
+        status = None
+        values = []
+        for line in output.splitlines():
+            if line.startswith('s '):
+                status = line[2:].strip()
+            elif line.startswith('v '):
+                values.extend(int(token) for token in line[2:].split())
+        if status is None:
+            status = {10: 'SATISFIABLE',
+                      20: 'UNSATISFIABLE'}.get(returncode, 'UNKNOWN')
+
+        if status == 'UNSATISFIABLE':
+            return False, None
+        if status != 'SATISFIABLE':
+            return UNKNOWN, None
+        model = set(literal for literal in values if literal != 0)
+        for var in range(1, num_vars + 1):
+            if var not in model and -var not in model:
+                model.add(-var)
+        return True, model
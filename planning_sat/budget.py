@@ -0,0 +1,81 @@
+"""Budget
+
+Description:
+    This module bounds how long a solver searches: a wall-clock deadline,
+    a conflict and decision budget and a cancel token that another thread
+    can set while the solver runs
+
+License:
+    Copyright 2021 Debby Nirwan
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+import threading
+import time
+
+# status of a solve that ran out of budget before deciding the formulas,
+# returned as (UNKNOWN, None) next to (True, model) and (False, None)
+UNKNOWN = None
+
+
+class CancelToken(object):
+    """Thread-safe flag checked by the solver inside its search loop.
+
+    A multiprocessing Event can be passed in to share the flag with
+    solvers running in other processes.
+    """
+
+    def __init__(self, event=None):
+        self._event = threading.Event() if event is None else event
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class Budget(object):
+    """Limits of a single solve.
+
+    time_limit is in seconds from the start of the solve, deadline an
+    absolute time.perf_counter() value; conflicts and decisions count
+    from the start of the solve. Any limit left as None is unbounded.
+    """
+
+    def __init__(self, time_limit=None, deadline=None, conflicts=None,
+                 decisions=None, cancel_token: CancelToken = None):
+        self._time_limit = time_limit
+        self._deadline = deadline
+        self._conflicts = conflicts
+        self._decisions = decisions
+        self._cancel_token = cancel_token
+        self._stop_time = deadline
+
+    def start(self):
+        self._stop_time = self._deadline
+        if self._time_limit is not None:
+            stop_time = time.perf_counter() + self._time_limit
+            if self._stop_time is None or stop_time < self._stop_time:
+                self._stop_time = stop_time
+
+    def exhausted(self, conflicts: int, decisions: int) -> bool:
+        if self._conflicts is not None and conflicts > self._conflicts:
+            return True
+        if self._decisions is not None and decisions > self._decisions:
+            return True
+        if self._cancel_token is not None and self._cancel_token.cancelled:
+            return True
+        return self._stop_time is not None and \
+            time.perf_counter() >= self._stop_time
@@ -0,0 +1,251 @@
+"""CDCL
+
+Description:
+    This module runs CDCL (Conflict-Driven Clause Learning) Algorithm
+    to solve satisfiability problem
+
+License:
+    Copyright 2021 Debby Nirwan
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+from planning_sat.backend import SolverBackend
+from planning_sat.budget import Budget, UNKNOWN
+from planning_sat.clause_arena import ClauseArena
+from planning_sat.clause_database import LearnedClauseDatabase
+from planning_sat.propagation import PropagationEngine
+from planning_sat.restarts import RESTARTS
+from typing import List, Optional
+import random
+
+
+class CDCL(PropagationEngine, SolverBackend):
+    """Conflict-driven clause learning solver.
+
+    Takes the same formulas as DavisPutnam, either Clause objects or
+    integer clauses, and returns (sat, model) where the model is a full
+    assignment. Conflicts are analysed to the first unique implication
+    point, the learned clause is kept and the search backjumps
+    non-chronologically to the second highest level in that clause.
+
+    The decision heuristic is 'evsids' (default), 'vsids' or 'order',
+    which branches on the lowest unassigned variable. The restart schedule
+    is 'luby' (default), 'glucose' or 'none'. With phase saving a decision
+    reuses the last polarity of its variable, so restarts keep the
+    assignments that did not lead to conflicts.
+
+    Learned clauses are reduced every reduce_interval conflicts, keeping
+    those with an LBD of at most core_lbd, see LearnedClauseDatabase.
+
+    With a seed, a random_frequency share of the decisions branches on a
+    random variable instead, so that solvers with different seeds take
+    different paths through the same formulas.
+
+    After each solve its counters are in statistics; progress, when
+    given, is called with them every progress_interval conflicts and
+    every progress_interval decisions.
+
+    The solver can also be used incrementally: add_clauses() adds to the
+    clauses of earlier calls, and solve() takes assumptions that only hold
+    for that call, so learned clauses carry over from one call to the next.
+    """
+
+    def __init__(self, heuristic='evsids', restarts='luby',
+                 phase_saving=True, reduce_interval=2000, core_lbd=2,
+                 seed=None, random_frequency=0.02, progress=None,
+                 progress_interval=1000):
+        self._set_heuristic(heuristic, 'order')
+        self._set_progress(progress, progress_interval)
+        if restarts not in RESTARTS:
+            raise ValueError(f"unknown restart schedule {restarts}")
+        self._restarts = RESTARTS[restarts]()
+        self._phase_saving = phase_saving
+        self._learnts = LearnedClauseDatabase(reduce_interval,
+                                              core_lbd=core_lbd)
+        self._seed = seed
+        self._random_frequency = random_frequency
+        self._random = None
+        self.reset()
+
+    def _solve(self, formulas: List[List[int]], model, budget: Budget):
+        self.reset()
+        self.add_clauses(formulas)
+        return self.solve(model, budget)
+
+    def reset(self):
+        """Forgets all clauses, learned ones included"""
+        self._reset(0)
+        self._ok = True
+        if self._seed is not None:
+            self._random = random.Random(self._seed)
+        self._restarts.reset()
+        self._learnts.reset()
+
+    def add_clauses(self, formulas: List[List[int]]) -> bool:
+        """Adds integer clauses to the solver, keeping what it has learned
+        so far. Returns False once the clauses are unsatisfiable. The
+        clauses are read once, a generator such as
+        PlanningProblemEncoder.iter_clauses() is first collected in a
+        ClauseArena."""
+        self._cancel_until(0)
+        if not hasattr(formulas, '__len__'):
+            formulas = ClauseArena(formulas)
+        self._grow(max((abs(literal) for clause in formulas
+                        for literal in clause), default=0))
+        self._ok = self._ok and self._add_clauses(formulas)
+        return self._ok
+
+    def solve(self, assumptions: List[int] = (), budget: Budget = None):
+        """Solves the clauses added so far with every assumption literal
+        taken as true for this call only. Gives up with (UNKNOWN, None)
+        once the budget is exhausted; calling solve() again resumes the
+        search with everything learned so far."""
+        self._start_statistics()
+        if not self._ok:
+            return False, None
+        assumptions = list(assumptions)
+        self._grow(max((abs(literal) for literal in assumptions),
+                       default=0))
+        if budget is not None:
+            budget.start()
+        try:
+            return self._search(assumptions, budget)
+        finally:
+            self._cancel_until(0)
+            self._update_statistics()
+
+    def _search(self, assumptions: List[int], budget: Budget = None):
+        statistics = self._statistics
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                if not self._trail_lim:
+                    self._ok = False
+                    return False, None
+                self._on_conflict()
+                if budget is not None and budget.exhausted(
+                        statistics.conflicts, statistics.decisions):
+                    return UNKNOWN, None
+                learnt, backtrack_level = self._analyze(conflict)
+                if self._order is not None:
+                    self._order.decay()
+                lbd = self._lbd(learnt)
+                self._restarts.on_conflict(lbd)
+                self._learnts.on_conflict()
+                self._cancel_until(backtrack_level)
+                statistics.learned_clauses += 1
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], None)
+                else:
+                    index = self._attach(learnt)
+                    self._learnts.add(index, lbd)
+                    self._enqueue(learnt[0], index)
+                if self._learnts.should_reduce():
+                    self._detach(self._learnts.reduce(self._locked))
+            elif self._restarts.should_restart():
+                self._cancel_until(0)
+                self._restarts.on_restart()
+                statistics.restarts += 1
+            elif len(self._trail_lim) < len(assumptions):
+                # assumptions are decided first, one per decision level
+                literal = assumptions[len(self._trail_lim)]
+                value = self._value(literal)
+                if value < 0:
+                    return False, None
+                if value > 0:
+                    self._trail_lim.append(len(self._trail))
+                else:
+                    self._decide(literal)
+            else:
+                literal = self._pick_branch_literal()
+                if literal is None:
+                    return True, set(self._trail)
+                self._on_decision()
+                if budget is not None and budget.exhausted(
+                        statistics.conflicts, statistics.decisions):
+                    return UNKNOWN, None
+                self._decide(literal)
+                if len(self._trail_lim) > statistics.max_decision_level:
+                    statistics.max_decision_level = len(self._trail_lim)
+
+    def _analyze(self, conflict: int):
+        seen = self._seen
+        level = self._level
+        order = self._order
+        current_level = len(self._trail_lim)
+        learnt = [0]
+        counter = 0
+        literal = None
+        index = len(self._trail) - 1
+        clause = self._clauses[conflict]
+        self._learnts.bump(conflict)
+
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                var = abs(other)
+                if not seen[var] and level[var] > 0:
+                    seen[var] = True
+                    if order is not None:
+                        order.bump(var)
+                    if level[var] == current_level:
+                        counter += 1
+                    else:
+                        learnt.append(other)
+            # walk back the trail to the next literal involved in the
+            # conflict at the current level
+            while not seen[abs(self._trail[index])]:
+                index -= 1
+            literal = self._trail[index]
+            index -= 1
+            var = abs(literal)
+            seen[var] = False
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self._clauses[self._reason[var]]
+            self._learnts.bump(self._reason[var])
+
+        learnt[0] = -literal
+        for other in learnt[1:]:
+            seen[abs(other)] = False
+
+        if len(learnt) == 1:
+            return learnt, 0
+        # watch the literal of the highest remaining level next to the
+        # asserting literal, it is the last one to become unassigned
+        highest = max(range(1, len(learnt)),
+                      key=lambda k: level[abs(learnt[k])])
+        learnt[1], learnt[highest] = learnt[highest], learnt[1]
+        return learnt, level[abs(learnt[1])]
+
+    def _lbd(self, learnt: List[int]) -> int:
+        # literal block distance: the number of distinct decision levels
+        return len(set(self._level[abs(literal)] for literal in learnt))
+
+    def _pick_branch_literal(self) -> Optional[int]:
+        var = None
+        if self._random is not None and self._num_vars and \
+                self._random.random() < self._random_frequency:
+            var = self._random.randint(1, self._num_vars)
+            if self._assigns[var] != 0:
+                var = None
+        if var is None and self._order is not None:
+            var = self._order.pick(self._assigns)
+        elif var is None:
+            var = next((var for var in range(1, self._num_vars + 1)
+                        if self._assigns[var] == 0), None)
+        if var is None:
+            return None
+        if self._phase_saving:
+            return var * self._phase[var]
+        return -var
@@ -0,0 +1,90 @@
+"""Clause Arena
+
+Description:
+    This module stores integer clauses back to back in flat arrays, a
+    compact alternative to one Python list per clause
+
+License:
+    Copyright 2021 Debby Nirwan
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+from array import array
+from typing import Iterable, List
+
+
+class ClauseArena(object):
+    """Integer clauses kept in one literal buffer.
+
+    The literals of clause i are literals[offsets[i]:offsets[i + 1]]. A
+    clause takes 4 bytes per literal and 8 bytes of offset, and the
+    arrays pickle as raw bytes, which keeps the arena cheap to hand to
+    worker processes.
+
+    The arena is a sequence of clauses: indexing and iterating give each
+    clause as a list, so it can be passed to the solvers as formulas.
+    """
+
+    def __init__(self, formulas: Iterable[Iterable[int]] = ()):
+        self.literals = array('i')
+        self.offsets = array('q', [0])
+        self.extend(formulas)
+
+    @classmethod
+    def from_arrays(cls, literals: array, offsets: array) -> 'ClauseArena':
+        """Arena over existing literal and offset arrays, with offsets
+        starting at 0 and ending at len(literals)"""
+        arena = cls()
+        arena.literals = literals
+        arena.offsets = offsets
+        return arena
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> List[int]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("clause index out of range")
+        return self.literals[self.offsets[index]:
+                             self.offsets[index + 1]].tolist()
+
+    def __iter__(self):
+        literals = self.literals
+        offsets = self.offsets
+        for index in range(len(self)):
+            yield literals[offsets[index]:offsets[index + 1]].tolist()
+
+    def append(self, clause: Iterable[int]) -> int:
+        """Adds a clause and returns its index"""
+        self.literals.extend(clause)
+        self.offsets.append(len(self.literals))
+        return len(self.offsets) - 2
+
+    def extend(self, formulas: Iterable[Iterable[int]]):
+        for clause in formulas:
+            self.append(clause)
+
+    def size(self, index: int) -> int:
+        return self.offsets[index + 1] - self.offsets[index]
+
+    @property
+    def num_vars(self) -> int:
+        return max((abs(literal) for literal in self.literals), default=0)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes taken by the arrays holding the clauses"""
+        return sum(len(values) * values.itemsize for values in
+                   (self.literals, self.offsets))
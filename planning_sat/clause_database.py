@@ -0,0 +1,87 @@
+"""Clause Database
+
+Description:
+    This module keeps track of the clauses learned by the CDCL solver and
+    decides which of them are deleted to keep the solver memory bounded
+
+License:
+    Copyright 2021 Debby Nirwan
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+from typing import Callable, List
+
+
+class LearnedClauseDatabase(object):
+    """Learned clauses with their LBD and activity.
+
+    Every interval conflicts (the interval grows by interval_increment
+    after each reduction) the clauses with an LBD (literal block distance)
+    of at most core_lbd are kept, and of the others the worse half by LBD
+    and then activity is deleted. Clauses in use as a reason are never
+    deleted.
+    """
+
+    def __init__(self, interval=2000, interval_increment=300, core_lbd=2,
+                 decay=0.999):
+        self._first_interval = interval
+        self._interval_increment = interval_increment
+        self._core_lbd = core_lbd
+        self._decay = decay
+        self.reset()
+
+    def __len__(self):
+        return len(self._clauses)
+
+    def __contains__(self, index: int):
+        return index in self._clauses
+
+    def reset(self):
+        # clause index -> [lbd, activity]
+        self._clauses = {}
+        self._increment = 1.0
+        self._interval = self._first_interval
+        self._conflicts = 0
+
+    def add(self, index: int, lbd: int):
+        self._clauses[index] = [lbd, self._increment]
+
+    def bump(self, index: int):
+        info = self._clauses.get(index)
+        if info is None:
+            return
+        info[1] += self._increment
+        if info[1] > 1e20:
+            for other in self._clauses.values():
+                other[1] *= 1e-20
+            self._increment *= 1e-20
+
+    def on_conflict(self):
+        self._conflicts += 1
+        self._increment /= self._decay
+
+    def should_reduce(self) -> bool:
+        return self._conflicts >= self._interval
+
+    def reduce(self, locked: Callable[[int], bool]) -> List[int]:
+        self._conflicts = 0
+        self._interval += self._interval_increment
+
+        candidates = [index for index, (lbd, _) in self._clauses.items()
+                      if lbd > self._core_lbd and not locked(index)]
+        candidates.sort(key=lambda index: (-self._clauses[index][0],
+                                           self._clauses[index][1]))
+        removed = candidates[:len(candidates) // 2]
+        for index in removed:
+            del self._clauses[index]
+        return removed
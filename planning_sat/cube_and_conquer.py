@@ -0,0 +1,200 @@
+"""Cube and Conquer
+
+Description:
+    This module splits propositional formulas into disjoint cubes with
+    lookahead and solves the cubes in parallel with CDCL solvers in
+    worker processes
+
+License:
+    Copyright 2021 Debby Nirwan
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+from planning_sat.backend import SolverBackend
+from planning_sat.budget import Budget, CancelToken, UNKNOWN
+from planning_sat.cdcl import CDCL
+from planning_sat.clause_arena import ClauseArena
+from planning_sat.propagation import PropagationEngine
+from array import array
+from itertools import chain
+from typing import Iterable, List, Optional, Tuple
+import math
+import multiprocessing
+import os
+
+# CDCL solver and cancel token of a worker process, set up once per worker
+# so that what it learns on one cube carries over to the next
+_worker_solver = None
+_worker_token = None
+
+
+def _init_worker(arena: ClauseArena, cancel_event):
+    global _worker_solver, _worker_token
+    _worker_solver = CDCL()
+    _worker_solver.add_clauses(arena)
+    _worker_token = CancelToken(cancel_event)
+
+
+def _solve_cube(cube: List[int]):
+    sat, model = _worker_solver.solve(
+        cube, Budget(cancel_token=_worker_token))
+    return sat, None if model is None else array('i', sorted(model))
+
+
+class Lookahead(PropagationEngine):
+    """Splits formulas into cubes by lookahead.
+
+    Every split branches on the candidate variable whose two literals
+    propagate the most assignments, scored by the product of both counts.
+    A literal that propagates to a conflict is failed: only the other
+    branch is kept. Cubes refuted by propagation are left out, so the
+    formulas are satisfiable exactly when one of the cubes is.
+    """
+
+    def __init__(self):
+        self._set_heuristic('order', 'order')
+
+    def __call__(self, formulas: List[List[int]], depth: int,
+                 candidates: Iterable[int] = None) -> Optional[List]:
+        """Cubes of at most depth literals, None when the formulas are
+        refuted by propagation"""
+        if not self._load(formulas) or self._propagate() is not None:
+            return None
+        if candidates is None:
+            candidates = range(1, self._num_vars + 1)
+        self._candidates = [abs(var) for var in candidates
+                            if abs(var) <= self._num_vars]
+        cubes = []
+        self._split([], depth, cubes)
+        return cubes
+
+    def _look(self, literal: int) -> Optional[int]:
+        level = len(self._trail_lim)
+        start = len(self._trail)
+        self._decide(literal)
+        conflict = self._propagate()
+        implied = len(self._trail) - start
+        self._cancel_until(level)
+        return None if conflict is not None else implied
+
+    def _split(self, cube: List[int], depth: int, cubes: List):
+        level = len(self._trail_lim)
+        cube = list(cube)
+        refuted, var = self._lookahead(cube) if depth > 0 else (False, None)
+        if var is None and not refuted:
+            cubes.append(cube)
+        elif var is not None:
+            forced = len(self._trail_lim)
+            for literal in (var, -var):
+                self._decide(literal)
+                if self._propagate() is None:
+                    self._split(cube + [literal], depth - 1, cubes)
+                self._cancel_until(forced)
+        self._cancel_until(level)
+
+    def _lookahead(self, cube: List[int]) -> Tuple[bool, Optional[int]]:
+        # (refuted, variable to split on). Failed literals are assigned
+        # where they are found and their other literal added to cube, as
+        # they do not count towards the depth; the candidates are then
+        # scored again, until a whole pass finds none.
+        while True:
+            branch = None
+            best = -1
+            failed = False
+            for var in self._candidates:
+                if self._assigns[var] != 0:
+                    continue
+                positive = self._look(var)
+                negative = self._look(-var)
+                if positive is None and negative is None:
+                    return True, None
+                if positive is None or negative is None:
+                    literal = var if negative is None else -var
+                    self._decide(literal)
+                    if self._propagate() is not None:
+                        return True, None
+                    cube.append(literal)
+                    failed = True
+                elif positive * negative > best:
+                    best = positive * negative
+                    branch = var
+            if not failed:
+                return False, branch
+
+
+class CubeAndConquer(SolverBackend):
+    """Solves formulas by splitting them into cubes solved in parallel.
+
+    Lookahead splits the formulas into about cubes_per_worker cubes for
+    each worker, branching only on the candidate variables when given,
+    e.g. the actions of the first steps of a planning problem. The cubes
+    are handed out one at a time from a shared queue, so a worker that is
+    done with an easy cube takes the next one while others still work on
+    hard ones. Each worker solves its cubes as assumptions of a single
+    incremental CDCL solver. The first satisfiable cube wins and the
+    other workers are cancelled. Takes the same formulas as CDCL and
+    returns (sat, model).
+
+    A budget bounds the time and can cancel the workers; its conflict and
+    decision limits are not used.
+    """
+
+    def __init__(self, workers=None, cubes_per_worker=4,
+                 candidates: Iterable[int] = None, poll_interval=0.05):
+        self._workers = workers or os.cpu_count() or 1
+        self._cubes_per_worker = cubes_per_worker
+        self._candidates = None if candidates is None else list(candidates)
+        self._poll_interval = poll_interval
+        self._cubes = []
+
+    @property
+    def cubes(self) -> List[List[int]]:
+        """The cubes of the last solve"""
+        return self._cubes
+
+    def _solve(self, formulas: List[List[int]], model, budget: Budget):
+        # one compact copy with the model as unit clauses, shared by the
+        # lookahead and every worker
+        arena = ClauseArena(chain(formulas,
+                                  ([literal] for literal in model)))
+        depth = math.ceil(math.log2(self._workers * self._cubes_per_worker))
+        cubes = Lookahead()(arena, depth, self._candidates)
+        self._cubes = cubes or []
+        if not cubes:
+            return False, None
+
+        context = multiprocessing.get_context()
+        cancel_event = context.Event()
+        workers = context.Pool(min(self._workers, len(self._cubes)),
+                               _init_worker,
+                               (arena, cancel_event))
+        try:
+            results = workers.imap_unordered(_solve_cube, self._cubes)
+            unknown = False
+            for _ in self._cubes:
+                while True:
+                    if budget is not None and budget.exhausted(0, 0):
+                        return UNKNOWN, None
+                    try:
+                        sat, model = results.next(self._poll_interval)
+                        break
+                    except multiprocessing.TimeoutError:
+                        continue
+                if sat:
+                    return True, set(model)
+                unknown = unknown or sat is UNKNOWN
+            return (UNKNOWN if unknown else False), None
+        finally:
+            cancel_event.set()
+            workers.terminate()
+            workers.join()
@@ -19,145 +19,173 @@ License:
     See the License for the specific language governing permissions and
     limitations under the License.
 """
-from planning_sat.encoder import PlanningProblemEncoder, Operator, Clause
-from typing import List, Set
-import copy
-import pddlpy
+from planning_sat.backend import ExternalSolver, SolverBackend
+from planning_sat.budget import Budget, UNKNOWN
+from planning_sat.encoder import EXCLUSIONS, PlanningProblemEncoder
+from planning_sat.cdcl import CDCL
+from planning_sat.cube_and_conquer import CubeAndConquer
+from planning_sat.dimacs import write_encoding
+from planning_sat.portfolio import Portfolio
+from planning_sat.preprocessing import Preprocessor
+from planning_sat.propagation import PropagationEngine
+from typing import List
 import time
 import argparse
 import os
 import sys
 
 
-class DavisPutnam(object):
-
-    def __call__(self, formulas: List[Clause], model=None):
-
-        if len(formulas) == 0:
-            return True, model
-
-        if any([clause.empty for clause in formulas]):
+class DavisPutnam(PropagationEngine, SolverBackend):
+
+    def __init__(self, heuristic='order', progress=None,
+                 progress_interval=1000, pure_literals=False):
+        # 'order' branches on the first literal of the first unsatisfied
+        # clause, 'vsids' and 'evsids' on the most active variable
+        self._set_heuristic(heuristic, 'order')
+        # progress is called with the statistics of the running solve
+        self._set_progress(progress, progress_interval)
+        # with pure_literals, a literal whose negation is left in no
+        # unsatisfied clause is assigned before every decision
+        self._pure_literals = pure_literals
+
+    def _solve(self, formulas: List[List[int]], model, budget: Budget):
+        self._start_statistics()
+        try:
+            return self._search(formulas, model, budget)
+        finally:
+            self._update_statistics()
+
+    def _search(self, formulas: List[List[int]], model, budget: Budget):
+        if not self._load(formulas, model):
             return False, None
-
-        if not model:
-            model = set()
-
-        next_clause, unit = self._select_literal(formulas)
-
-        if not unit or ('not' not in next_clause):
-            positive_formulas = copy.deepcopy(formulas)
-            positive_clause = self._pos_clause(next_clause)
-            new_model, new_formulas = self._unit_propagation(positive_formulas,
-                                                             model,
-                                                             positive_clause)
-
-            sat, new_model = self.__call__(new_formulas, new_model)
-            if sat:
-                return sat, new_model
-
-        if not unit or ('not' in next_clause):
-            negative_formulas = copy.deepcopy(formulas)
-            negative_clause = self._neg_clause(next_clause)
-            new_model, new_formulas = self._unit_propagation(negative_formulas,
-                                                             model,
-                                                             negative_clause)
-
-            sat, new_model = self.__call__(new_formulas, new_model)
-            if sat:
-                return sat, new_model
-
-        return False, None
-
-    def _select_literal(self, formulas):
-        if formulas == list():
-            return None, None
-
-        unit_clause = self._get_unit_clause(formulas)
-        if unit_clause:
-            return unit_clause, True
-
-        return formulas[0].clause[0], False
-
-    @staticmethod
-    def _get_unit_clause(formulas):
-        for clause in formulas:
-            if clause.is_single:
-                return clause.clause[0]
-        return None
-
-    @staticmethod
-    def _unit_propagation(formulas: List[Clause], model: Set[Clause],
-                          unit_clause):
-
-        new_formulas = copy.deepcopy(formulas)
-        model = model.union(unit_clause)
-
-        if not new_formulas:
-            return model, new_formulas
-
-        if 'not' in unit_clause.clause[0]:
-            reverse_clause = list(unit_clause.clause[0])
-            reverse_clause.remove('not')
-            not_unit_clause = Clause(tuple(reverse_clause))
-        else:
-            reverse_clause = ('not',) + unit_clause.clause[0]
-            not_unit_clause = Clause(reverse_clause)
-
-        for clause in list(new_formulas):
-            for cl in clause.clause:
-                if isinstance(cl, Operator):
-                    continue
-                if unit_clause.clause[0] == cl:
-                    new_formulas.remove(clause)
+        if self._propagate() is not None:
+            return False, None
+        if self._pure_literals:
+            self._count_occurrences()
+
+        return self._dpll(budget)
+
+    def _count_occurrences(self):
+        # for every literal the number of clauses it occurs in that no
+        # processed assignment satisfies yet, and for every clause its
+        # number of true literals; the trail is processed up to _counted
+        num_vars = self._num_vars
+        self._occurrences = [[] for _ in range(2 * num_vars + 1)]
+        self._unsatisfied = [0] * (2 * num_vars + 1)
+        for index, clause in enumerate(self._clauses):
+            for literal in clause:
+                self._occurrences[literal].append(index)
+                self._unsatisfied[literal] += 1
+        self._true_literals = [0] * len(self._clauses)
+        self._counted = 0
+        self._pure = [literal for var in range(1, num_vars + 1)
+                      for literal in (var, -var)
+                      if self._unsatisfied[-literal] == 0]
+        self._count_trail()
+
+    def _count_trail(self):
+        clauses = self._clauses
+        occurrences = self._occurrences
+        unsatisfied = self._unsatisfied
+        true_literals = self._true_literals
+        trail = self._trail
+        while self._counted < len(trail):
+            for index in occurrences[trail[self._counted]]:
+                true_literals[index] += 1
+                if true_literals[index] == 1:
+                    for literal in clauses[index]:
+                        unsatisfied[literal] -= 1
+                        if unsatisfied[literal] == 0:
+                            self._pure.append(-literal)
+            self._counted += 1
+
+    def _cancel_until(self, level: int):
+        if self._pure_literals and level < len(self._trail_lim):
+            clauses = self._clauses
+            unsatisfied = self._unsatisfied
+            true_literals = self._true_literals
+            limit = self._trail_lim[level]
+            while self._counted > limit:
+                self._counted -= 1
+                for index in self._occurrences[self._trail[self._counted]]:
+                    true_literals[index] -= 1
+                    if true_literals[index] == 0:
+                        for literal in clauses[index]:
+                            unsatisfied[literal] += 1
+        super()._cancel_until(level)
+
+    def _assign_pure_literals(self):
+        self._count_trail()
+        while self._pure:
+            literal = self._pure.pop()
+            # assignments and backtracking since it was found may have
+            # made it impure again
+            if self._assigns[abs(literal)] == 0 and \
+                    self._unsatisfied[-literal] == 0:
+                self._enqueue(literal, None)
+                self._statistics.pure_literals += 1
+                self._count_trail()
+
+    def _dpll(self, budget: Budget = None):
+        # one entry per decision level: the clause the branching literal
+        # was taken from and the branch being explored, the positive
+        # branch is always explored first
+        decisions = []
+        first = 0
+        statistics = self._statistics
+
+        while True:
+            if self._pure_literals:
+                self._assign_pure_literals()
+            literal, first = self._select_literal(first)
+            if literal is None:
+                return True, set(self._trail)
+
+            self._on_decision()
+            if budget is not None and budget.exhausted(
+                    statistics.conflicts, statistics.decisions):
+                return UNKNOWN, None
+            decisions.append((first, abs(literal)))
+            self._decide(abs(literal))
+            if len(decisions) > statistics.max_decision_level:
+                statistics.max_decision_level = len(decisions)
+
+            while True:
+                conflict = self._propagate()
+                if conflict is None:
                     break
-                if not_unit_clause.clause[0] == cl:
-                    new_formulas.remove(clause)
-                    new_clause = Clause()
-                    literals = []
-                    for literal in clause:
-                        if not isinstance(literal, Operator) and \
-                                literal != not_unit_clause.clause[0]:
-                            literals.append(literal)
-                    if literals:
-                        for literal in literals:
-                            new_clause.add(literal, Operator.OR)
-                    new_formulas.append(new_clause)
+                self._on_conflict()
+                if budget is not None and budget.exhausted(
+                        statistics.conflicts, statistics.decisions):
+                    return UNKNOWN, None
+                if self._order is not None:
+                    for literal in self._clauses[conflict]:
+                        self._order.bump(abs(literal))
+                    self._order.decay()
+                while decisions and decisions[-1][1] < 0:
+                    decisions.pop()
+                if not decisions:
+                    return False, None
+                first, literal = decisions.pop()
+                self._cancel_until(len(decisions))
+                decisions.append((first, -literal))
+                self._decide(-literal)
+
+    def _select_literal(self, first: int):
+        if self._order is not None:
+            return self._order.pick(self._assigns), first
+        # clauses before first are already satisfied on this branch
+        for index in range(first, len(self._clauses)):
+            unassigned = None
+            for literal in self._clauses[index]:
+                value = self._value(literal)
+                if value > 0:
                     break
-
-        return model, new_formulas
-
-    @staticmethod
-    def _pos_clause(atom: tuple):
-        if 'not' in atom:
-            pos_atom = list(atom)
-            pos_atom.remove('not')
-            pos_atom = tuple(pos_atom)
-        else:
-            pos_atom = atom
-
-        return Clause(pos_atom)
-
-    @staticmethod
-    def _neg_clause(atom: tuple):
-        if 'not' in atom:
-            neg_atom = atom
-        else:
-            neg_atom = ('not',) + atom
-
-        return Clause(neg_atom)
-
-    @staticmethod
-    def _pos_and_neg_atoms(atom: tuple):
-        if 'not' in atom:
-            neg_atom = atom
-            pos_atom = list(atom)
-            pos_atom.remove('not')
-            pos_atom = tuple(pos_atom)
-        else:
-            pos_atom = atom
-            neg_atom = ('not',) + atom
-
-        return pos_atom, neg_atom
+                if value == 0 and unassigned is None:
+                    unassigned = literal
+            else:
+                return unassigned, index
+        return None, len(self._clauses)
 
 
 def setup_parser() -> argparse.ArgumentParser:
@@ -188,6 +216,86 @@ def setup_parser() -> argparse.ArgumentParser:
         help="specify the length of steps in formulas encoding"
     )
 
+    parser.add_argument(
+        "-s", "--solver",
+        choices=["dpll", "cdcl", "portfolio", "cubes", "external"],
+        default="dpll",
+        help="solver to run over the encoded formulas"
+    )
+
+    parser.add_argument(
+        "--heuristic",
+        choices=["order", "vsids", "evsids"],
+        help="decision heuristic, defaults to the solver's own default"
+    )
+
+    parser.add_argument(
+        "--restarts",
+        choices=["none", "luby", "glucose"],
+        help="restart schedule of the cdcl solver"
+    )
+
+    parser.add_argument(
+        "-j", "--workers",
+        type=int,
+        help="number of solver processes of the portfolio and of cube and "
+             "conquer, one per CPU by default"
+    )
+
+    parser.add_argument(
+        "--solver-command",
+        type=str,
+        default="kissat -q",
+        help="DIMACS solver binary run by the external solver, with its "
+             "options"
+    )
+
+    parser.add_argument(
+        "--preprocess",
+        action='store_true',
+        help="simplify the formulas before solving"
+    )
+
+    parser.add_argument(
+        "--probing",
+        action='store_true',
+        help="run failed-literal probing when preprocessing"
+    )
+
+    parser.add_argument(
+        "--pure-literals",
+        action='store_true',
+        help="assign pure literals during the dpll search, and eliminate "
+             "them when preprocessing"
+    )
+
+    parser.add_argument(
+        "--equivalences",
+        action='store_true',
+        help="substitute equivalent literals when preprocessing"
+    )
+
+    parser.add_argument(
+        "-x", "--exclusion",
+        choices=EXCLUSIONS,
+        default="complete",
+        help="exclude all pairs of actions from a step, or only those "
+             "that interfere to find parallel plans"
+    )
+
+    parser.add_argument(
+        "--dimacs",
+        type=str,
+        help="also write the encoded formulas to this DIMACS file (gzipped "
+             "when it ends in .gz) next to a .vars variable map"
+    )
+
+    parser.add_argument(
+        "-t", "--time-limit",
+        type=float,
+        help="give up after this many seconds"
+    )
+
     parser.add_argument(
         "-f", "--print",
         action='store_true',
@@ -208,26 +316,82 @@ if __name__ == "__main__":
     length = args.length
     print_debug = args.print
 
-    pp_encoder = PlanningProblemEncoder(domain_file, problem_file, length)
-
-    davis_putnam = DavisPutnam()
+    pp_encoder = PlanningProblemEncoder(domain_file, problem_file, length,
+                                        direct=True,
+                                        exclusion=args.exclusion)
+    if args.dimacs:
+        write_encoding(args.dimacs, pp_encoder,
+                       [f"{domain_file} {problem_file} length {length}"])
+
+    solver_options = {}
+    frozen = []
+    if args.heuristic:
+        solver_options["heuristic"] = args.heuristic
+    if args.solver == "cdcl":
+        if args.restarts:
+            solver_options["restarts"] = args.restarts
+        solver_name = "CDCL"
+        davis_putnam = CDCL(**solver_options)
+    elif args.solver == "portfolio":
+        solver_name = "Portfolio"
+        davis_putnam = Portfolio(args.workers)
+    elif args.solver == "cubes":
+        # the cubes branch on which actions are taken in the first steps
+        solver_name = "Cube and Conquer"
+        frozen = [var for step in range(min(2, length))
+                  for var in pp_encoder.action_variables(step)]
+        davis_putnam = CubeAndConquer(args.workers, candidates=frozen)
+    elif args.solver == "external":
+        solver_name = args.solver_command
+        davis_putnam = ExternalSolver(args.solver_command)
+    else:
+        solver_name = "Davis-Putnam"
+        davis_putnam = DavisPutnam(pure_literals=args.pure_literals,
+                                   **solver_options)
+
+    formulas = pp_encoder.integer_formulas
+    preprocessor = None
+    if args.preprocess or args.probing or args.equivalences:
+        preprocessor = Preprocessor(probing=args.probing,
+                                    equivalences=args.equivalences,
+                                    pure_literals=args.pure_literals)
+        formulas = preprocessor(formulas, frozen)
+        if print_debug:
+            print(f"Preprocessing reduced {len(pp_encoder.integer_formulas)} "
+                  f"formulas to {len(formulas)}")
+            for name, stats in preprocessor.statistics.items():
+                print(f"  {name}: removed {stats['removed_clauses']} "
+                      f"formulas in {stats['time']:0.4f} s")
 
     if print_debug:
-        print(f"Davis-Putnam algorithm running with "
-              f"{len(pp_encoder.propositional_formulas)} formulas")
+        print(f"{solver_name} algorithm running with "
+              f"{len(formulas)} formulas")
     start_time = time.perf_counter()
-    result_dp, final_model = davis_putnam(pp_encoder.propositional_formulas)
+    budget = None
+    if args.time_limit is not None:
+        budget = Budget(time_limit=args.time_limit)
+    result_dp, final_model = davis_putnam(formulas, budget=budget)
     end_time = time.perf_counter()
+    if result_dp and preprocessor is not None:
+        final_model = preprocessor.extend(final_model)
     if print_debug:
-        print(f"Davis-Putnam algorithm ran for {end_time-start_time:0.4f} s")
+        print(f"{solver_name} algorithm ran for {end_time-start_time:0.4f} s")
+        if isinstance(davis_putnam, PropagationEngine):
+            statistics = davis_putnam.statistics
+            print(f"  {statistics.decisions} decisions, "
+                  f"{statistics.conflicts} conflicts, "
+                  f"{statistics.restarts} restarts, "
+                  f"{statistics.learned_clauses} learned clauses, "
+                  f"{statistics.pure_literals} pure literals, "
+                  f"maximum decision level {statistics.max_decision_level}")
+            print(f"  {statistics.propagations} propagations, "
+                  f"{statistics.propagations_per_second:0.0f} per second")
         if result_dp:
             print("Plan:")
-            operator_list = []
-            for item in final_model:
-                if 'not' not in item and isinstance(item[0], pddlpy.Operator):
-                    operator_list.append(item)
-            operator_list.sort(key=lambda tup: tup[-1])
-            for op in operator_list:
+            for op in pp_encoder.decode_plan(final_model):
                 print(op)
+        elif result_dp is UNKNOWN:
+            print(f"Gave up planning at length {length} after "
+                  f"{args.time_limit} s")
         else:
             print(f"Failed to plan at length {length}")
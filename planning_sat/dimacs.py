@@ -0,0 +1,169 @@
+"""DIMACS
+
+Description:
+    This module writes integer clauses to DIMACS CNF files and reads them
+    back, together with a variable map that names the fluent or action
+    behind every variable so that models can be decoded into plans
+
+License:
+    Copyright 2021 Debby Nirwan
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+from planning_sat.clause_arena import ClauseArena
+from planning_sat.encoder import VariablePool
+from pddlpy import Operator as Action
+from array import array
+from itertools import compress, count
+from typing import Iterable, TextIO, Tuple
+import gzip
+import operator
+
+
+def _open(path: str, mode: str):
+    # files ending in .gz are compressed, on writing and on reading
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='ascii', compresslevel=6)
+    return open(path, mode, encoding='ascii')
+
+
+def variable_map_path(path: str) -> str:
+    """The variable map next to a DIMACS file, e.g. plan.cnf.vars for
+    plan.cnf and plan.cnf.gz"""
+    if path.endswith('.gz'):
+        path = path[:-3]
+    return path + '.vars'
+
+
+def write_dimacs(path: str, formulas: Iterable[Iterable[int]],
+                 num_vars: int = None, comments: Iterable[str] = (),
+                 num_clauses: int = None):
+    """Writes integer clauses to a DIMACS file, see dump_dimacs()"""
+    with _open(path, 'w') as cnf:
+        dump_dimacs(cnf, formulas, num_vars, comments, num_clauses)
+
+
+def dump_dimacs(stream: TextIO, formulas: Iterable[Iterable[int]],
+                num_vars: int = None, comments: Iterable[str] = (),
+                num_clauses: int = None):
+    """Writes integer clauses to a text stream one line at a time.
+
+    The header needs the number of clauses and variables. When both are
+    given, formulas can be a generator that is consumed as it is written.
+    Otherwise formulas is iterated twice, and a generator is first
+    collected in a ClauseArena.
+    """
+    if num_vars is None or num_clauses is None:
+        if not hasattr(formulas, '__len__'):
+            formulas = ClauseArena(formulas)
+        num_clauses = len(formulas)
+    if num_vars is None:
+        num_vars = max((abs(literal) for clause in formulas
+                        for literal in clause), default=0)
+
+    for comment in comments:
+        stream.write(f"c {comment}\n")
+    stream.write(f"p cnf {num_vars} {num_clauses}\n")
+    stream.writelines(' '.join(map(str, clause)) + ' 0\n'
+                      for clause in formulas)
+
+
+def _clause_lines(text: str):
+    for line in text.splitlines():
+        if line.startswith('%'):
+            # the end marker of the SATLIB benchmark files
+            return
+        if not line.startswith(('c', 'p')):
+            yield line
+
+
+def read_dimacs(path: str) -> ClauseArena:
+    """Reads the clauses of a DIMACS file into a ClauseArena.
+
+    Tokens are converted and split into clauses by C-level iterators,
+    without a Python loop over the literals.
+    """
+    with _open(path, 'r') as cnf:
+        text = cnf.read()
+
+    # comments and the header normally come first, the clauses are then
+    # converted in one go and only filtered line by line when that fails
+    body_start = 0
+    while body_start < len(text) and text[body_start] in 'cp\n':
+        line_end = text.find('\n', body_start)
+        body_start = len(text) if line_end < 0 else line_end + 1
+    try:
+        tokens = array('i', map(int, text[body_start:].split()))
+    except ValueError:
+        tokens = array('i', map(int, ' '.join(
+            _clause_lines(text[body_start:])).split()))
+    if tokens and tokens[-1] != 0:
+        tokens.append(0)
+    zeros = list(compress(count(), map(operator.not_, tokens)))
+    # the k-th terminating zero sits after k earlier zeros
+    ends = map(operator.sub, zeros, count())
+    return ClauseArena.from_arrays(array('i', filter(None, tokens)),
+                                   array('q', [0]) + array('q', ends))
+
+
+def write_variable_map(path: str, pool: VariablePool):
+    """Writes one line per variable: the variable, 'fluent' or 'action',
+    the step and the fluent or the action with its parameters"""
+    with _open(path, 'w') as names:
+        for var in range(1, len(pool) + 1):
+            atom = pool.atom(var)
+            step = atom[-1]
+            if isinstance(atom[0], Action):
+                parameters = ' '.join(
+                    f"{name}={value}" for name, value in
+                    atom[0].variable_list.items())
+                names.write(f"{var} action {step} "
+                            f"{atom[0].operator_name} {parameters}\n")
+            else:
+                names.write(f"{var} fluent {step} {' '.join(atom[:-1])}\n")
+
+
+def read_variable_map(path: str) -> VariablePool:
+    """Reads a variable map back into a VariablePool whose atoms equal the
+    encoder's, so that its models decode with decode_plan()"""
+    pool = VariablePool()
+    with _open(path, 'r') as names:
+        for line in names:
+            fields = line.split()
+            if not fields:
+                continue
+            var, kind, step, name = fields[:4]
+            if kind == 'action':
+                atom = (Action(name, dict(parameter.split('=', 1)
+                                          for parameter in fields[4:])),
+                        step)
+            else:
+                atom = (name,) + tuple(fields[4:]) + (step,)
+            if pool.variable(atom) != int(var):
+                raise ValueError(f"variable {var} out of order in {path}")
+    return pool
+
+
+def write_encoding(path: str, encoder, comments: Iterable[str] = ()):
+    """Writes the formulas of a PlanningProblemEncoder, streamed from
+    iter_clauses(), and their variable map"""
+    pool = encoder.variable_pool
+    write_dimacs(path, encoder.iter_clauses(), len(pool), comments,
+                 encoder.num_clauses())
+    write_variable_map(variable_map_path(path), pool)
+
+
+def read_encoding(path: str) -> Tuple[ClauseArena, VariablePool]:
+    """Reads the formulas and the variable map written by
+    write_encoding()"""
+    return read_dimacs(path), read_variable_map(variable_map_path(path))
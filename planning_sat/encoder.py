@@ -20,8 +20,11 @@ License:
     limitations under the License.
 """
 from .pddl_adapter import PlanningProblem
+from pddlpy import Operator as Action
 from enum import Enum
-from itertools import combinations
+from planning_sat.clause_arena import ClauseArena
+from itertools import chain, combinations
+from typing import Iterable, Iterator, List, Set, Tuple
 
 
 class Operator(Enum):
@@ -84,113 +87,502 @@ class Clause(object):
         return self._clause == []
 
 
-class PlanningProblemEncoder(object):
+class VariablePool(object):
+    """Interns fluent and action atoms as dense positive integers.
+
+    An atom is a fluent or action tuple carrying its step suffix, e.g.
+    ('atl', 'rob', 'loc1', '0') or (<Operator>, '0'). Literals are signed
+    integers: a negative literal is the negation of its variable.
+    """
 
-    def __init__(self, dom_file: str, problem_file: str, length=1):
+    def __init__(self):
+        self._ids = {}
+        self._atoms = [None]
+
+    def __len__(self):
+        return len(self._atoms) - 1
+
+    def __contains__(self, atom):
+        return atom in self._ids
+
+    def variable(self, atom: tuple) -> int:
+        var = self._ids.get(atom)
+        if var is None:
+            var = len(self._atoms)
+            self._ids[atom] = var
+            self._atoms.append(atom)
+        return var
+
+    def literal(self, fluent: tuple) -> int:
+        if fluent[0] == 'not':
+            return -self.variable(fluent[1:])
+        return self.variable(fluent)
+
+    def atom(self, literal: int) -> tuple:
+        return self._atoms[abs(literal)]
+
+    def fluent(self, literal: int) -> tuple:
+        atom = self._atoms[abs(literal)]
+        if literal < 0:
+            return ('not',) + atom
+        return atom
+
+    def encode(self, clause: Clause) -> List[int]:
+        return [self.literal(fluent) for fluent in clause
+                if not isinstance(fluent, Operator)]
+
+    def encode_formulas(self, formulas: Iterable[Clause]) -> List[List[int]]:
+        return [self.encode(clause) for clause in formulas]
+
+    def decode(self, model: Iterable[int]) -> Set[tuple]:
+        return set(self.fluent(literal) for literal in model)
+
+
+def intern_formulas(formulas: List, model=None):
+    """Turns solver input into integer clauses.
+
+    Returns the integer clauses, the model as integer literals and the
+    pool used for interning, which is None when the input was already
+    integer clauses. Integer clauses, e.g. a ClauseArena, are returned
+    as they are, not copied. Formulas without a length, such as
+    iter_clauses(), are read once: integer clauses into a ClauseArena,
+    Clause objects into a list.
+    """
+    if not hasattr(formulas, '__len__'):
+        formulas = iter(formulas)
+        first = next(formulas, None)
+        formulas = chain(() if first is None else [first], formulas)
+        formulas = list(formulas) if isinstance(first, Clause) else \
+            ClauseArena(formulas)
+    if formulas and isinstance(formulas[0], Clause):
+        pool = VariablePool()
+        formulas = pool.encode_formulas(formulas)
+        if model:
+            model = set(pool.literal(fluent) for fluent in model)
+        return formulas, model, pool
+    return formulas, model, None
+
+
+def decode_plan(model: Iterable[int], pool: VariablePool) -> List[tuple]:
+    """The actions true in an integer model as (action, step) tuples,
+    ordered by step"""
+    plan = []
+    for literal in model:
+        if literal > 0:
+            atom = pool.atom(literal)
+            if isinstance(atom[0], Action):
+                plan.append(atom)
+    plan.sort(key=lambda atom: int(atom[-1]))
+    return plan
+
+
+EXCLUSIONS = ['complete', 'interference']
+
+
+class PlanningProblemEncoder(object):
+    """Encodes a Planning Problem of the given length into CNF.
+
+    The integer clauses are written directly from variable ids computed
+    once per fluent and action, without building Clause objects. With
+    direct=True the Clause objects of propositional_formulas are only
+    built when that property is first read.
+
+    exclusion='complete' allows one action per step. With 'interference'
+    two actions are only excluded from a step when one deletes a
+    precondition or an add effect of the other, so that a step holds a
+    set of actions that can be executed in any order (forall-step
+    semantics): plans are parallel and need fewer steps.
+    """
+
+    def __init__(self, dom_file: str, problem_file: str, length=1,
+                 direct=False, exclusion='complete'):
+        if exclusion not in EXCLUSIONS:
+            raise ValueError(f"unknown exclusion axioms {exclusion}")
         self._problem = PlanningProblem(dom_file, problem_file)
         self._length = length
-        self._propositional_formulas = self._encode()
-
-    def _encode(self):
-        actions = self._problem.actions
+        self._exclusion = exclusion
+        self._interfering = None
+        self._fluent_ids = None
+        self._step_template = None
+        self._template_categories = None
+        self._propositional_formulas = None if direct else self._encode()
+        self._variable_pool = VariablePool()
+        self._pool_length = -1
+        self._extend_variable_pool(length)
+        self._integer_formulas = None
+        self._clause_arena = None
+
+    def _extend_variable_pool(self, length: int):
+        # variables are numbered step by step, fluents first, so that the
+        # variables of a step form one contiguous block and the numbering
+        # of a shorter encoding is a prefix of the numbering of a longer one
+        actions = [act for act in self._problem.actions
+                   if not act.effect_pos.issubset(act.precondition_pos)]
+        for step in range(self._pool_length + 1, length + 1):
+            if step > 0:
+                for act in actions:
+                    self._variable_pool.variable((act, str(step - 1)))
+            for fluent in self._problem.fluents:
+                self._variable_pool.variable(fluent + (str(step),))
+        self._pool_length = max(self._pool_length, length)
+
+    def initial_formulas(self) -> List[List[int]]:
+        return list(self._initial_integers())
+
+    def step_formulas(self, step: int) -> List[List[int]]:
+        """Integer clauses of the transition from step to step + 1"""
+        self._extend_variable_pool(step + 1)
+        return list(self._step_clauses(step))
+
+    def goal_literals(self, step: int) -> List[int]:
+        """The goal state at step as literals, e.g. to solve with them as
+        assumptions of an incremental solver"""
+        self._extend_variable_pool(step)
+        return [clause[0] for clause in self._goal_integers(step)]
+
+    def iter_clauses(self, length: int = None) -> Iterator[List[int]]:
+        """Yields the integer clauses of the encoding one at a time: those
+        of the initial state, then the action clauses, frame axioms and
+        exclusion axioms of every step in turn and those of the goal
+        state. Besides the clause being yielded, at most the clauses of
+        one step are held in memory: the cached step_template and the
+        step being shifted from it, whatever the length."""
+        if length is None:
+            length = self._length
+        self._extend_variable_pool(length)
+        yield from self._initial_integers()
+        for step in range(length):
+            yield from self._step_clauses(step)
+        yield from self._goal_integers(length)
+
+    def num_clauses(self, length: int = None) -> int:
+        """Number of clauses iter_clauses() yields, e.g. for a DIMACS
+        header written before the clauses"""
+        if length is None:
+            length = self._length
+        self._prepare_integer_encoding()
+        actions = len(self._step_actions)
+        per_step = sum(len(self._preconditions[index]) +
+                       len(self._add_effects[index]) +
+                       len(self._del_effects[index])
+                       for index in range(actions)) + \
+            sum(1 for adders in self._adders if adders) + \
+            sum(1 for deleters in self._deleters if deleters)
+        if self._exclusion == 'complete':
+            per_step += actions * (actions - 1) // 2
+        else:
+            per_step += len(self._exclusion_pairs())
+        return len(self._fluent_ids) + len(self._problem.goal_state) + \
+            length * per_step
+
+    def action_variables(self, step: int) -> List[int]:
+        """Variables of the actions that can be taken at step"""
+        self._extend_variable_pool(step + 1)
+        return [self._variable_pool.variable((act, str(step)))
+                for act in self._problem.actions
+                if (act, str(step)) in self._variable_pool]
+
+    def decode_plan(self, model) -> List[tuple]:
+        """The actions true in an integer model as (action, step) tuples,
+        ordered by step"""
+        return decode_plan(model, self._variable_pool)
+
+    def _prepare_integer_encoding(self):
+        # the variable of a fluent or action at step is its index in the
+        # first block plus step blocks, see _extend_variable_pool
+        if self._fluent_ids is not None:
+            return
         fluents = self._problem.fluents
+        self._fluent_ids = {fluent: index + 1
+                            for index, fluent in enumerate(fluents)}
+        # actions whose add effects all hold already are never encoded,
+        # _step_index maps the index of the others in the problem's
+        # actions to their index at a step
+        self._step_actions = []
+        self._step_index = {}
+        for index, act in enumerate(self._problem.actions):
+            if not act.effect_pos.issubset(act.precondition_pos):
+                self._step_index[index] = len(self._step_actions)
+                self._step_actions.append(act)
+        self._block = len(fluents) + len(self._step_actions)
+
+        ids = self._fluent_ids
+        self._preconditions = []
+        self._add_effects = []
+        self._del_effects = []
+        for act in self._step_actions:
+            self._preconditions.append([ids[p] for p in act.precondition_pos
+                                        if 'adjacent' not in p])
+            self._add_effects.append([ids[e] for e in act.effect_pos])
+            self._del_effects.append([ids[e] for e in act.effect_neg])
+        self._adders = []
+        self._deleters = []
+        step_index = self._step_index
+        for fluent in fluents:
+            self._adders.append([step_index[index]
+                                 for index in self._step_adders(fluent)])
+            self._deleters.append([step_index[index]
+                                   for index in self._step_deleters(fluent)])
+
+    def _step_adders(self, fluent: tuple) -> List[int]:
+        return [index for index in self._problem.adders[fluent]
+                if index in self._step_index]
+
+    def _step_deleters(self, fluent: tuple) -> List[int]:
+        # an action adding and deleting the fluent only counts as adder
+        actions = self._problem.actions
+        return [index for index in self._problem.deleters[fluent]
+                if index in self._step_index and
+                fluent not in actions[index].effect_pos]
+
+    def _initial_integers(self):
+        self._prepare_integer_encoding()
+        init_state = self._problem.initial_state
+        for fluent, var in self._fluent_ids.items():
+            yield [var] if fluent in init_state else [-var]
+
+    def _goal_integers(self, step: int):
+        self._prepare_integer_encoding()
+        offset = step * self._block
+        for goal in self._problem.goal_state:
+            yield [self._fluent_ids[goal] + offset]
+
+    def _action_integers(self, step: int):
+        self._prepare_integer_encoding()
+        offset = step * self._block
+        next_offset = offset + self._block
+        action_offset = offset + len(self._fluent_ids) + 1
+        for index in range(len(self._step_actions)):
+            action = -(action_offset + index)
+            for var in self._preconditions[index]:
+                yield [action, var + offset]
+            for var in self._add_effects[index]:
+                yield [action, var + next_offset]
+            for var in self._del_effects[index]:
+                yield [action, -(var + next_offset)]
+
+    def _frame_integers(self, step: int):
+        self._prepare_integer_encoding()
+        offset = step * self._block
+        next_offset = offset + self._block
+        action_offset = offset + len(self._fluent_ids) + 1
+        for var, adders, deleters in zip(self._fluent_ids.values(),
+                                         self._adders, self._deleters):
+            if adders:
+                yield [var + offset, -(var + next_offset)] + \
+                    [action_offset + index for index in adders]
+            if deleters:
+                yield [-(var + offset), var + next_offset] + \
+                    [action_offset + index for index in deleters]
+
+    def _exclusion_integers(self, step: int):
+        self._prepare_integer_encoding()
+        action_offset = step * self._block + len(self._fluent_ids) + 1
+        for first, second in self._exclusion_pairs():
+            yield [-(action_offset + first), -(action_offset + second)]
+
+    def _exclusion_pairs(self):
+        # indices of the step actions that cannot be taken together
+        if self._exclusion == 'complete':
+            return combinations(range(len(self._step_actions)), 2)
+        if self._interfering is None:
+            self._interfering = self._interfering_pairs()
+        return self._interfering
+
+    def _interfering_pairs(self) -> List[Tuple[int, int]]:
+        # the actions deleting a fluent interfere with those requiring or
+        # adding it
+        step_index = self._step_index
+        adders = self._problem.adders
+        requirers = self._problem.requirers
+        pairs = set()
+        for fluent, deleters in self._problem.deleters.items():
+            others = [step_index[index] for index in
+                      requirers.get(fluent, []) + adders.get(fluent, [])
+                      if index in step_index]
+            for deleter in deleters:
+                if deleter not in step_index:
+                    continue
+                first = step_index[deleter]
+                pairs.update((min(first, other), max(first, other))
+                             for other in others if other != first)
+        return sorted(pairs)
 
+    @property
+    def step_template(self) -> ClauseArena:
+        """Integer clauses of the transition from step 0 to step 1: the
+        action clauses, frame axioms and exclusion axioms. Those of any
+        other step are the same with every variable moved by step blocks
+        of step_offset variables."""
+        if self._step_template is None:
+            template = ClauseArena(self._action_integers(0))
+            # where the frame and the exclusion axioms start
+            self._template_categories = [0, len(template)]
+            template.extend(self._frame_integers(0))
+            self._template_categories.append(len(template))
+            template.extend(self._exclusion_integers(0))
+            self._template_categories.append(len(template))
+            self._step_template = template
+        return self._step_template
+
+    @property
+    def step_offset(self) -> int:
+        """Number of variables of a step: its fluents and actions"""
+        self._prepare_integer_encoding()
+        return self._block
+
+    def _step_clauses(self, step: int, category: int = None):
+        # the template moved to step, only its action clauses (0), frame
+        # axioms (1) or exclusion axioms (2) when category is given
+        template = self.step_template
+        categories = self._template_categories
+        first, last = (0, len(template)) if category is None else \
+            categories[category:category + 2]
+        offsets = template.offsets
+        start = offsets[first]
+        shift = step * self._block
+        literals = [literal + shift if literal > 0 else literal - shift
+                    for literal in template.literals[start:offsets[last]]]
+        for index in range(first, last):
+            yield literals[offsets[index] - start:offsets[index + 1] - start]
+
+    def _encode_integers(self):
+        # the clauses of _encode() in the same order
+        length = self._length
+        yield from self._initial_integers()
+        yield from self._goal_integers(length)
+        for category in range(3):
+            for step in range(length):
+                yield from self._step_clauses(step, category)
+
+    def _encode(self):
         # 1. encode initial state
+        init_state_clauses = self._encode_initial_state()
+
+        # 2. encode goal state
+        goal_state_clauses = self._encode_goal_state(self._length)
+
+        enc_actions_clauses = []
+        explanatory_frame_axioms = []
+        complete_exclusion_axiom = []
+
+        for step in range(self._length):
+            action_clauses, frame_axioms, exclusion_axioms = \
+                self._encode_step(step)
+            enc_actions_clauses += action_clauses
+            explanatory_frame_axioms += frame_axioms
+            complete_exclusion_axiom += exclusion_axioms
+
+        proposition_formulas = init_state_clauses + goal_state_clauses + \
+            enc_actions_clauses + explanatory_frame_axioms + \
+            complete_exclusion_axiom
+
+        return proposition_formulas
+
+    def _encode_initial_state(self):
         init_state = list(self._problem.initial_state)
         init_state_clauses = []
-        for fluent in list(fluents):
+        for fluent in list(self._problem.fluents):
             if fluent not in init_state:
                 fluent = ('not',) + fluent
             fluent = fluent + ('0',)
             init_state_clauses.append(Clause(fluent))
+        return init_state_clauses
 
-        # 2. encode goal state
+    def _encode_goal_state(self, step: int):
         goal_state = list(self._problem.goal_state)
         goal_state_clauses = []
         for goal in goal_state:
-            goal_state_clauses.append(Clause(goal + (str(self._length),)))
+            goal_state_clauses.append(Clause(goal + (str(step),)))
+        return goal_state_clauses
+
+    def _encode_step(self, step: int):
+        self._prepare_integer_encoding()
+        actions = self._problem.actions
+        fluents = self._problem.fluents
 
         enc_actions_clauses = []
         explanatory_frame_axioms = []
         complete_exclusion_axiom = []
 
-        for step in range(self._length):
-            # 3. encode actions
-            for act in actions:
-                if act.effect_pos.issubset(act.precondition_pos):
-                    continue
-                action_tuple = ('not', act, str(step))
-                # preconditions
-                for p in act.precondition_pos:
-                    if 'adjacent' in p:
-                        continue
-                    action_clause = Clause(action_tuple)
-                    p = p + (str(step),)
-                    action_clause.add(p, Operator.OR)
-                    enc_actions_clauses.append(action_clause)
-                # positive effects
-                for e in act.effect_pos:
-                    e = e + (str(step + 1),)
-                    action_clause = Clause(action_tuple)
-                    action_clause.add(e, Operator.OR)
-                    enc_actions_clauses.append(action_clause)
-                # negative effects
-                for e in act.effect_neg:
-                    e = ('not',) + e + (str(step + 1),)
-                    action_clause = Clause(action_tuple)
-                    action_clause.add(e, Operator.OR)
-                    enc_actions_clauses.append(action_clause)
-
-            # 4. explanatory frame axioms
-            for fluent in fluents:
-                act_with_pos_effect = []
-                act_with_neg_effect = []
-                for act in actions:
-                    if act.effect_pos.issubset(act.precondition_pos):
-                        continue
-                    if fluent in act.effect_pos:
-                        act_with_pos_effect.append(act)
-                    elif fluent in act.effect_neg:
-                        act_with_neg_effect.append(act)
-                if act_with_pos_effect:
-                    a_pos = fluent + (str(step),)
-                    b_pos = ('not',) + fluent + (str(step + 1),)
-                    clause_pos = Clause(a_pos)
-                    clause_pos.add(b_pos, Operator.OR)
-                    for act in act_with_pos_effect:
-                        c_pos = (act, str(step))
-                        clause_pos.add(c_pos, Operator.OR)
-                    explanatory_frame_axioms.append(clause_pos)
-                if act_with_neg_effect:
-                    a_neg = ('not',) + fluent + (str(step),)
-                    b_neg = fluent + (str(step + 1),)
-                    clause_neg = Clause(a_neg)
-                    clause_neg.add(b_neg, Operator.OR)
-                    for act in act_with_neg_effect:
-                        c_neg = (act, str(step))
-                        clause_neg.add(c_neg, Operator.OR)
-                    explanatory_frame_axioms.append(clause_neg)
-
-            # 5. complete exclusion axiom
-            for action_pair in combinations(actions, 2):
-                if action_pair[0].effect_pos.issubset(
-                        action_pair[0].precondition_pos):
-                    continue
-                if action_pair[1].effect_pos.issubset(
-                        action_pair[1].precondition_pos):
+        # 3. encode actions
+        for act in self._step_actions:
+            action_tuple = ('not', act, str(step))
+            # preconditions
+            for p in act.precondition_pos:
+                if 'adjacent' in p:
                     continue
-                action0_tuple = ('not', action_pair[0], str(step))
-                action1_tuple = ('not', action_pair[1], str(step))
-                action_pair_clause = Clause(action0_tuple)
-                action_pair_clause.add(action1_tuple, Operator.OR)
-                complete_exclusion_axiom.append(action_pair_clause)
-
-        proposition_formulas = init_state_clauses + goal_state_clauses + \
-            enc_actions_clauses + explanatory_frame_axioms + \
+                action_clause = Clause(action_tuple)
+                p = p + (str(step),)
+                action_clause.add(p, Operator.OR)
+                enc_actions_clauses.append(action_clause)
+            # positive effects
+            for e in act.effect_pos:
+                e = e + (str(step + 1),)
+                action_clause = Clause(action_tuple)
+                action_clause.add(e, Operator.OR)
+                enc_actions_clauses.append(action_clause)
+            # negative effects
+            for e in act.effect_neg:
+                e = ('not',) + e + (str(step + 1),)
+                action_clause = Clause(action_tuple)
+                action_clause.add(e, Operator.OR)
+                enc_actions_clauses.append(action_clause)
+
+        # 4. explanatory frame axioms
+        for fluent in fluents:
+            act_with_pos_effect = [actions[index] for index in
+                                   self._step_adders(fluent)]
+            act_with_neg_effect = [actions[index] for index in
+                                   self._step_deleters(fluent)]
+            if act_with_pos_effect:
+                a_pos = fluent + (str(step),)
+                b_pos = ('not',) + fluent + (str(step + 1),)
+                clause_pos = Clause(a_pos)
+                clause_pos.add(b_pos, Operator.OR)
+                for act in act_with_pos_effect:
+                    c_pos = (act, str(step))
+                    clause_pos.add(c_pos, Operator.OR)
+                explanatory_frame_axioms.append(clause_pos)
+            if act_with_neg_effect:
+                a_neg = ('not',) + fluent + (str(step),)
+                b_neg = fluent + (str(step + 1),)
+                clause_neg = Clause(a_neg)
+                clause_neg.add(b_neg, Operator.OR)
+                for act in act_with_neg_effect:
+                    c_neg = (act, str(step))
+                    clause_neg.add(c_neg, Operator.OR)
+                explanatory_frame_axioms.append(clause_neg)
+
+        # 5. exclusion axioms, complete or between interfering actions
+        for first, second in self._exclusion_pairs():
+            action0_tuple = ('not', self._step_actions[first], str(step))
+            action1_tuple = ('not', self._step_actions[second], str(step))
+            action_pair_clause = Clause(action0_tuple)
+            action_pair_clause.add(action1_tuple, Operator.OR)
+            complete_exclusion_axiom.append(action_pair_clause)
+
+        return enc_actions_clauses, explanatory_frame_axioms, \
             complete_exclusion_axiom
 
-        return proposition_formulas
-
     @property
     def propositional_formulas(self):
+        if self._propositional_formulas is None:
+            self._propositional_formulas = self._encode()
         return self._propositional_formulas
+
+    @property
+    def variable_pool(self):
+        return self._variable_pool
+
+    @property
+    def integer_formulas(self):
+        if self._integer_formulas is None:
+            self._integer_formulas = list(self._encode_integers())
+        return self._integer_formulas
+
+    @property
+    def clause_arena(self) -> ClauseArena:
+        if self._clause_arena is None:
+            self._clause_arena = ClauseArena(self._encode_integers())
+        return self._clause_arena
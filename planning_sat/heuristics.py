@@ -0,0 +1,184 @@
+"""Heuristics
+
+Description:
+    This module provides the activity-based decision heuristics (VSIDS and
+    exponential VSIDS) the solvers use to pick branching variables
+
+License:
+    Copyright 2021 Debby Nirwan
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+from typing import List, Optional
+
+
+class ActivityHeap(object):
+    """Binary max-heap of variables keyed on their activity.
+
+    Keeps the heap position of every variable so that bumping a variable
+    already in the heap only sifts it up.
+    """
+
+    def __init__(self, num_vars: int):
+        self.activity = [0.0] * (num_vars + 1)
+        self._heap = list(range(1, num_vars + 1))
+        self._indices = [-1] + list(range(num_vars))
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, var: int):
+        return self._indices[var] >= 0
+
+    def grow(self, num_vars: int):
+        first = len(self.activity)
+        self.activity += [0.0] * (num_vars + 1 - first)
+        self._indices += [-1] * (num_vars + 1 - first)
+        for var in range(first, num_vars + 1):
+            self.push(var)
+
+    def push(self, var: int):
+        if self._indices[var] >= 0:
+            return
+        self._indices[var] = len(self._heap)
+        self._heap.append(var)
+        self._sift_up(self._indices[var])
+
+    def pop(self) -> int:
+        heap = self._heap
+        top = heap[0]
+        last = heap.pop()
+        self._indices[top] = -1
+        if heap:
+            heap[0] = last
+            self._indices[last] = 0
+            self._sift_down(0)
+        return top
+
+    def increase(self, var: int, amount: float):
+        self.activity[var] += amount
+        if self._indices[var] >= 0:
+            self._sift_up(self._indices[var])
+
+    def rescale(self, factor: float):
+        # a uniform scale keeps the heap order intact
+        self.activity = [value * factor for value in self.activity]
+
+    def _sift_up(self, position: int):
+        heap = self._heap
+        indices = self._indices
+        activity = self.activity
+        var = heap[position]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if activity[heap[parent]] >= activity[var]:
+                break
+            heap[position] = heap[parent]
+            indices[heap[position]] = position
+            position = parent
+        heap[position] = var
+        indices[var] = position
+
+    def _sift_down(self, position: int):
+        heap = self._heap
+        indices = self._indices
+        activity = self.activity
+        var = heap[position]
+        size = len(heap)
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and \
+                    activity[heap[child + 1]] > activity[heap[child]]:
+                child += 1
+            if activity[heap[child]] <= activity[var]:
+                break
+            heap[position] = heap[child]
+            indices[heap[position]] = position
+            position = child
+        heap[position] = var
+        indices[var] = position
+
+
+class VSIDS(object):
+    """Variable State Independent Decaying Sum (Chaff).
+
+    Every variable involved in a conflict gets its activity bumped by one,
+    and every period conflicts all activities are multiplied by decay.
+    """
+
+    def __init__(self, decay=0.5, period=256):
+        self._decay = decay
+        self._period = period
+        self._heap = None
+        self._conflicts = 0
+
+    def reset(self, num_vars: int):
+        self._heap = ActivityHeap(num_vars)
+        self._conflicts = 0
+
+    def grow(self, num_vars: int):
+        self._heap.grow(num_vars)
+
+    def bump(self, var: int):
+        self._heap.increase(var, 1.0)
+
+    def decay(self):
+        self._conflicts += 1
+        if self._conflicts % self._period == 0:
+            self._heap.rescale(self._decay)
+
+    def unassigned(self, variables: List[int]):
+        for var in variables:
+            self._heap.push(var)
+
+    def pick(self, assigns: List[int]) -> Optional[int]:
+        heap = self._heap
+        while len(heap):
+            var = heap.pop()
+            if assigns[var] == 0:
+                return var
+        return None
+
+
+class EVSIDS(VSIDS):
+    """Exponential VSIDS (MiniSat).
+
+    Instead of decaying every activity, the bump increment grows by
+    1 / decay after each conflict, so recent conflicts weigh more.
+    """
+
+    def __init__(self, decay=0.95):
+        super().__init__(decay)
+        self._increment = 1.0
+
+    def reset(self, num_vars: int):
+        super().reset(num_vars)
+        self._increment = 1.0
+
+    def bump(self, var: int):
+        self._heap.increase(var, self._increment)
+        if self._heap.activity[var] > 1e100:
+            self._heap.rescale(1e-100)
+            self._increment *= 1e-100
+
+    def decay(self):
+        self._conflicts += 1
+        self._increment /= self._decay
+
+
+HEURISTICS = {
+    'vsids': VSIDS,
+    'evsids': EVSIDS,
+}
@@ -19,7 +19,7 @@ License:
     limitations under the License.
 """
 from pddlpy import DomainProblem, Operator, Atom
-from typing import Set, Tuple, List
+from typing import Dict, Set, Tuple, List
 import itertools
 
 
@@ -35,6 +35,8 @@ class PlanningProblem(object):
         self._goal_state = self._to_set_of_tuples(self._domain_problem.goals())
         self._actions = self._get_ground_operators()
         self._formulas = self._get_ground_formulas()
+        self._adders, self._deleters, self._requirers = \
+            self._index_actions()
 
     @staticmethod
     def _type_symbols(variable_type, world_objects: dict):
@@ -85,6 +87,20 @@ class PlanningProblem(object):
                 ground_formulas.append(tuple(pred))
         return ground_formulas
 
+    def _index_actions(self):
+        # fluent -> indices of the actions adding, deleting or requiring it
+        adders = {fluent: [] for fluent in self._formulas}
+        deleters = {fluent: [] for fluent in self._formulas}
+        requirers = {fluent: [] for fluent in self._formulas}
+        for index, act in enumerate(self._actions):
+            for fluent in act.effect_pos:
+                adders.setdefault(fluent, []).append(index)
+            for fluent in act.effect_neg:
+                deleters.setdefault(fluent, []).append(index)
+            for fluent in act.precondition_pos:
+                requirers.setdefault(fluent, []).append(index)
+        return adders, deleters, requirers
+
     @staticmethod
     def _to_set_of_tuples(state: Set[Atom]) -> Set[Tuple]:
         set_of_tuples = set()
@@ -108,3 +124,19 @@ class PlanningProblem(object):
     @property
     def fluents(self):
         return self._formulas
+
+    @property
+    def adders(self) -> Dict[tuple, List[int]]:
+        """Fluent -> indices in actions of the actions adding it"""
+        return self._adders
+
+    @property
+    def deleters(self) -> Dict[tuple, List[int]]:
+        """Fluent -> indices in actions of the actions deleting it"""
+        return self._deleters
+
+    @property
+    def requirers(self) -> Dict[tuple, List[int]]:
+        """Fluent -> indices in actions of the actions having it as a
+        positive precondition, static facts such as adjacent included"""
+        return self._requirers
@@ -0,0 +1,333 @@
+"""Planner
+
+Description:
+    This module searches for the length of a plan: it encodes the
+    Planning Problem once, grows the encoding horizon by horizon and
+    solves the horizons following a sequential, exponential or
+    Rintanen-style interleaved schedule
+
+License:
+    Copyright 2021 Debby Nirwan
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+from planning_sat.backend import ExternalSolver, SolverBackend
+from planning_sat.budget import Budget, CancelToken, UNKNOWN
+from planning_sat.encoder import EXCLUSIONS, PlanningProblemEncoder
+from planning_sat.cdcl import CDCL
+from collections import defaultdict
+from typing import List
+import argparse
+import os
+import sys
+import time
+
+
+SCHEDULES = ['sequential', 'exponential', 'rintanen-b', 'rintanen-c']
+
+
+class Planner(object):
+    """Finds a plan without being told its length.
+
+    Calling the planner returns (plan, timings): the plan of the first
+    satisfiable horizon as (action, step) tuples, or None when no horizon
+    up to max_length has one, and for every horizon tried its result
+    (True, False or None when it was not decided) and solving time.
+
+    'sequential' tries the lengths 0, 1, 2, ... and 'exponential' the
+    lengths 0, 1, 2, 4, 8, ..., both with a single incremental solver in
+    which the goal is an assumption. 'rintanen-b' (Algorithm B) solves
+    the first horizons lengths at once, 'rintanen-c' (Algorithm C) every
+    horizon up to max_length, each with its own solver. Solvers are run
+    in rounds in which the horizon of rank i among the undecided ones
+    gets slice_conflicts * gamma ** i conflicts. A horizon found
+    unsatisfiable rules out the shorter ones too.
+
+    The search stops without a plan once time_limit seconds have passed
+    or the cancel token is cancelled.
+
+    A backend, e.g. an ExternalSolver, solves every length from scratch
+    instead of the built-in incremental solver. It is only used by the
+    'sequential' and 'exponential' schedules, since the Rintanen schedules
+    need a solver that can be paused and resumed.
+
+    exclusion='interference' searches parallel plans, in which a step can
+    hold several actions, see PlanningProblemEncoder.
+    """
+
+    def __init__(self, dom_file: str, problem_file: str,
+                 schedule='sequential', max_length=100, step=1,
+                 horizons=5, gamma=0.8, slice_conflicts=100,
+                 time_limit=None, cancel_token: CancelToken = None,
+                 backend: SolverBackend = None, exclusion='complete'):
+        if schedule not in SCHEDULES:
+            raise ValueError(f"unknown horizon schedule {schedule}")
+        if backend is not None and schedule.startswith('rintanen'):
+            raise ValueError(f"schedule {schedule} needs the built-in "
+                             f"solver")
+        self._schedule = schedule
+        self._max_length = max_length
+        self._step = step
+        self._horizons = horizons
+        self._gamma = gamma
+        self._slice_conflicts = slice_conflicts
+        self._time_limit = time_limit
+        self._cancel_token = cancel_token
+        self._backend = backend
+        self._deadline = None
+        # parsed, grounded and encoded once, the transition clauses of a
+        # step are reused by every horizon that contains it
+        self._encoder = PlanningProblemEncoder(dom_file, problem_file, 0,
+                                               direct=True,
+                                               exclusion=exclusion)
+        self._initial_formulas = self._encoder.initial_formulas()
+        self._step_formulas = []
+        self._timings = {}
+
+    def __call__(self):
+        self._timings = {}
+        self._deadline = None
+        if self._time_limit is not None:
+            self._deadline = time.perf_counter() + self._time_limit
+        if self._schedule == 'sequential':
+            model = self._incremental(range(self._max_length + 1))
+        elif self._schedule == 'exponential':
+            model = self._incremental(self._doubling_lengths())
+        elif self._schedule == 'rintanen-b':
+            model = self._interleaved(self._horizons)
+        else:
+            model = self._interleaved(None)
+
+        plan = None if model is None else self._encoder.decode_plan(model)
+        return plan, self._timings
+
+    def _doubling_lengths(self):
+        length = 0
+        while length <= self._max_length:
+            yield length
+            length = max(1, 2 * length)
+
+    def _stopped(self) -> bool:
+        if self._cancel_token is not None and self._cancel_token.cancelled:
+            return True
+        return self._deadline is not None and \
+            time.perf_counter() >= self._deadline
+
+    def _budget(self, conflicts=None) -> Budget:
+        return Budget(deadline=self._deadline, conflicts=conflicts,
+                      cancel_token=self._cancel_token)
+
+    def _transition(self, step: int) -> List[List[int]]:
+        while len(self._step_formulas) <= step:
+            self._step_formulas.append(
+                self._encoder.step_formulas(len(self._step_formulas)))
+        return self._step_formulas[step]
+
+    def _record(self, length: int, result, seconds: float):
+        timing = self._timings.setdefault(length,
+                                          {'result': None, 'time': 0.0})
+        timing['result'] = result
+        timing['time'] += seconds
+
+    def _incremental(self, lengths):
+        if self._backend is not None:
+            return self._from_scratch(lengths)
+        solver = CDCL()
+        solver.add_clauses(self._initial_formulas)
+        steps = 0
+        for length in lengths:
+            start_time = time.perf_counter()
+            while steps < length:
+                solver.add_clauses(self._transition(steps))
+                steps += 1
+            sat, model = solver.solve(self._encoder.goal_literals(length),
+                                      self._budget())
+            self._record(length, sat, time.perf_counter() - start_time)
+            if sat:
+                return model
+            if sat is UNKNOWN:
+                return None
+        return None
+
+    def _from_scratch(self, lengths):
+        for length in lengths:
+            start_time = time.perf_counter()
+            formulas = list(self._initial_formulas)
+            for step in range(length):
+                formulas += self._transition(step)
+            formulas += [[goal] for goal in
+                         self._encoder.goal_literals(length)]
+            sat, model = self._backend(formulas, budget=self._budget())
+            self._record(length, sat, time.perf_counter() - start_time)
+            if sat:
+                return model
+            if sat is UNKNOWN:
+                return None
+        return None
+
+    def _horizon_solver(self, length: int) -> CDCL:
+        solver = CDCL()
+        solver.add_clauses(self._initial_formulas)
+        for step in range(length):
+            solver.add_clauses(self._transition(step))
+        solver.add_clauses([[goal] for goal in
+                            self._encoder.goal_literals(length)])
+        return solver
+
+    def _interleaved(self, horizons):
+        pending = list(range(0, self._max_length + 1, self._step))
+        solvers = {}
+        credit = defaultdict(float)
+
+        while pending:
+            active = pending if horizons is None else pending[:horizons]
+            for rank, length in enumerate(list(active)):
+                if length not in pending:
+                    continue
+                # horizons with a tiny share save it up over the rounds
+                credit[length] += self._slice_conflicts * self._gamma ** rank
+                if credit[length] < 1:
+                    continue
+                conflicts = int(credit[length])
+                credit[length] -= conflicts
+
+                start_time = time.perf_counter()
+                if length not in solvers:
+                    solvers[length] = self._horizon_solver(length)
+                sat, model = solvers[length].solve(
+                    budget=self._budget(conflicts))
+                self._record(length, sat, time.perf_counter() - start_time)
+                if sat:
+                    return model
+                if sat is UNKNOWN and self._stopped():
+                    return None
+                if sat is False:
+                    for shorter in [other for other in pending
+                                    if other <= length]:
+                        pending.remove(shorter)
+                        solvers.pop(shorter, None)
+                        # proved unsatisfiable too, even if its own budget
+                        # ran out
+                        if shorter in self._timings:
+                            self._timings[shorter]['result'] = False
+        return None
+
+
+def setup_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Planning as Satisfiability with automatic plan length",
+        allow_abbrev=False
+    )
+
+    parser.add_argument(
+        "-d", "--domain",
+        required=True,
+        type=str,
+        help="path to pddl domain file"
+    )
+
+    parser.add_argument(
+        "-p", "--problem",
+        required=True,
+        type=str,
+        help="path to pddl problem file"
+    )
+
+    parser.add_argument(
+        "-s", "--schedule",
+        choices=SCHEDULES,
+        default="sequential",
+        help="order in which plan lengths are tried"
+    )
+
+    parser.add_argument(
+        "-m", "--max-length",
+        type=int,
+        default=100,
+        help="longest plan length to try"
+    )
+
+    parser.add_argument(
+        "-n", "--horizons",
+        type=int,
+        default=5,
+        help="number of horizons solved at once by rintanen-b"
+    )
+
+    parser.add_argument(
+        "-g", "--gamma",
+        type=float,
+        default=0.8,
+        help="share of time of a horizon relative to the previous one"
+    )
+
+    parser.add_argument(
+        "-x", "--exclusion",
+        choices=EXCLUSIONS,
+        default="complete",
+        help="exclude all pairs of actions from a step, or only those "
+             "that interfere to find parallel plans"
+    )
+
+    parser.add_argument(
+        "--solver-command",
+        type=str,
+        help="solve with this DIMACS solver binary, e.g. 'kissat -q', "
+             "instead of the built-in solver"
+    )
+
+    parser.add_argument(
+        "-t", "--time-limit",
+        type=float,
+        help="give up after this many seconds"
+    )
+
+    parser.add_argument(
+        "-f", "--print",
+        action='store_true',
+        help="print the result"
+    )
+
+    return parser
+
+
+if __name__ == "__main__":
+
+    args = setup_parser().parse_args()
+    if not os.path.isfile(args.domain) or not os.path.isfile(args.problem):
+        sys.exit(1)
+
+    backend = None
+    if args.solver_command:
+        backend = ExternalSolver(args.solver_command)
+    planner = Planner(args.domain, args.problem, args.schedule,
+                      args.max_length, horizons=args.horizons,
+                      gamma=args.gamma, time_limit=args.time_limit,
+                      backend=backend, exclusion=args.exclusion)
+
+    start_time = time.perf_counter()
+    plan, timings = planner()
+    end_time = time.perf_counter()
+    if args.print:
+        print(f"Planner ran for {end_time-start_time:0.4f} s")
+        for length, timing in sorted(timings.items()):
+            print(f"  length {length}: {timing['result']} "
+                  f"in {timing['time']:0.4f} s")
+        if plan is not None:
+            print("Plan:")
+            for op in plan:
+                print(op)
+        elif any(timing['result'] is None for timing in timings.values()):
+            print(f"Gave up planning after {args.time_limit} s")
+        else:
+            print(f"Failed to plan up to length {args.max_length}")
@@ -0,0 +1,141 @@
+"""Portfolio
+
+Description:
+    This module runs several differently configured CDCL solvers in
+    worker processes on the same formulas and takes the answer of the
+    first one to finish
+
+License:
+    Copyright 2021 Debby Nirwan
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+from planning_sat.backend import SolverBackend
+from planning_sat.budget import Budget, CancelToken, UNKNOWN
+from planning_sat.cdcl import CDCL
+from planning_sat.clause_arena import ClauseArena
+from array import array
+from typing import Dict, List
+import multiprocessing
+import os
+import queue
+
+# the configurations the workers take in turn, worker i also gets seed i
+CONFIGURATIONS = [
+    {'heuristic': 'evsids', 'restarts': 'luby'},
+    {'heuristic': 'evsids', 'restarts': 'glucose'},
+    {'heuristic': 'vsids', 'restarts': 'luby'},
+    {'heuristic': 'evsids', 'restarts': 'luby', 'phase_saving': False},
+    {'heuristic': 'vsids', 'restarts': 'glucose'},
+    {'heuristic': 'evsids', 'restarts': 'none'},
+]
+
+
+def _solve_worker(index: int, configuration: Dict, arena: ClauseArena,
+                  assumptions: array, cancel_event, results):
+    solver = CDCL(**configuration)
+    solver.add_clauses(arena)
+    budget = Budget(cancel_token=CancelToken(cancel_event))
+    sat, model = solver.solve(list(assumptions), budget)
+    results.put((index, sat,
+                 None if model is None else array('i', sorted(model))))
+
+
+class Portfolio(SolverBackend):
+    """Solves the formulas with several CDCL solvers in parallel.
+
+    Every worker process runs its own configuration, taken in turn from
+    CONFIGURATIONS and seeded with the index of the worker, on a copy of
+    the formulas in a ClauseArena. The first worker to decide the
+    formulas wins and the others are cancelled. Takes the same formulas
+    as CDCL and returns (sat, model).
+
+    The workers default to one per CPU. A budget bounds the time and can
+    cancel the workers; its conflict and decision limits are not used.
+    """
+
+    def __init__(self, workers=None, configurations: List[Dict] = None,
+                 poll_interval=0.05, grace_period=1.0):
+        self._workers = workers or os.cpu_count() or 1
+        self._configurations = configurations or CONFIGURATIONS
+        self._poll_interval = poll_interval
+        self._grace_period = grace_period
+        self._winner = None
+
+    def _solve(self, formulas: List[List[int]], model, budget: Budget):
+        if not isinstance(formulas, ClauseArena):
+            formulas = ClauseArena(formulas)
+        return self.solve(formulas, model, budget)
+
+    @property
+    def configurations(self) -> List[Dict]:
+        configurations = []
+        for index in range(self._workers):
+            configuration = dict(
+                self._configurations[index % len(self._configurations)])
+            configuration.setdefault('seed', index)
+            configurations.append(configuration)
+        return configurations
+
+    @property
+    def winner(self):
+        """Configuration of the worker that answered the last solve"""
+        return self._winner
+
+    def solve(self, arena: ClauseArena, assumptions: List[int] = (),
+              budget: Budget = None):
+        """Solves the clauses of the arena under assumptions"""
+        self._winner = None
+        if budget is not None:
+            budget.start()
+        context = multiprocessing.get_context()
+        cancel_event = context.Event()
+        results = context.Queue()
+        configurations = self.configurations
+        processes = [
+            context.Process(target=_solve_worker,
+                            args=(index, configuration, arena,
+                                  array('i', assumptions), cancel_event,
+                                  results),
+                            daemon=True)
+            for index, configuration in enumerate(configurations)]
+        for process in processes:
+            process.start()
+
+        try:
+            finished = 0
+            while finished < len(processes):
+                try:
+                    index, sat, model = results.get(
+                        timeout=self._poll_interval)
+                except queue.Empty:
+                    if budget is not None and budget.exhausted(0, 0):
+                        return UNKNOWN, None
+                    if not any(process.is_alive() for process in processes) \
+                            and results.empty():
+                        # workers that died without an answer
+                        return UNKNOWN, None
+                    continue
+                finished += 1
+                if sat is not UNKNOWN:
+                    self._winner = configurations[index]
+                    return sat, None if model is None else set(model)
+            return UNKNOWN, None
+        finally:
+            cancel_event.set()
+            for process in processes:
+                process.join(self._grace_period)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+            results.close()
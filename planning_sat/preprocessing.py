@@ -0,0 +1,411 @@
+"""Preprocessing
+
+Description:
+    This module simplifies propositional formulas in CNF before they are
+    passed to a solver (SatELite-style subsumption, self-subsuming
+    resolution and bounded variable elimination)
+
+License:
+    Copyright 2021 Debby Nirwan
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+from planning_sat.clause_arena import ClauseArena
+from collections import defaultdict
+from typing import Iterable, List, Optional, Set
+import time
+
+
+class Preprocessor(object):
+    """Simplifies integer clauses and reconstructs models afterwards.
+
+    Calling the preprocessor returns an equisatisfiable list of clauses
+    ([[]] when it finds the formulas unsatisfiable). A model of those
+    clauses is turned into a model of the original ones with extend(),
+    which replays the reconstruction stack of eliminated variables.
+
+    A variable is eliminated by resolution when that adds at most
+    max_growth clauses, and only tried when it has at most
+    max_occurrences occurrences in one of its polarities. Frozen
+    variables are never eliminated.
+
+    Three optional passes run first: pure_literals eliminates variables
+    that occur in one polarity only, together with their clauses,
+    equivalences substitutes literals that are equivalent in the binary
+    implication graph by one representative, and probing assigns both
+    polarities of every variable in turn, keeping the negation of failed
+    literals and the literals implied by both. The time and the clauses
+    removed by each pass are in statistics.
+    """
+
+    def __init__(self, subsumption=True, self_subsumption=True,
+                 variable_elimination=True, max_growth=0,
+                 max_occurrences=16, probing=False, equivalences=False,
+                 pure_literals=False):
+        self._subsumption = subsumption
+        self._self_subsumption = self_subsumption
+        self._variable_elimination = variable_elimination
+        self._max_growth = max_growth
+        self._max_occurrences = max_occurrences
+        self._probing = probing
+        self._equivalences = equivalences
+        self._pure_literals = pure_literals
+        self._variables = set()
+        self._stack = []
+        self._eliminated = set()
+        self._statistics = {}
+
+    def __call__(self, formulas: List[List[int]], frozen: Iterable[int] = ()):
+        self._clauses = {}
+        self._occurs = defaultdict(set)
+        self._next_id = 0
+        self._assigned = set()
+        self._pending = []
+        self._touched = set()
+        self._unsat = False
+        self._stack = []
+        self._eliminated = set()
+        self._frozen = set(abs(literal) for literal in frozen)
+        if not hasattr(formulas, '__len__'):
+            formulas = ClauseArena(formulas)
+        self._variables = set(abs(literal) for clause in formulas
+                              for literal in clause)
+        self._statistics = {}
+
+        for clause in formulas:
+            self._add(clause)
+        self._run('units', self._propagate)
+        if self._pure_literals:
+            self._run('pure_literals', self._eliminate_pure_literals)
+        if self._equivalences:
+            self._run('equivalences', self._substitute_equivalences)
+        if self._probing:
+            self._run('probing', self._probe)
+        if self._subsumption or self._self_subsumption:
+            self._run('subsumption', self._simplify)
+        if self._variable_elimination:
+            self._run('variable_elimination', self._eliminate)
+
+        if self._unsat:
+            return [[]]
+        return [[literal] for literal in sorted(self._assigned, key=abs)] + \
+            [sorted(clause, key=abs) for clause in self._clauses.values()]
+
+    def extend(self, model: Iterable[int]) -> Set[int]:
+        model = set(model)
+        # variables the solver never saw are free, take them as false
+        for var in self._variables:
+            if var not in model and -var not in model:
+                model.add(-var)
+        for literal, clause in reversed(self._stack):
+            if not any(other in model for other in clause):
+                model.discard(-literal)
+                model.add(literal)
+        return model
+
+    @property
+    def eliminated(self):
+        return self._eliminated
+
+    @property
+    def statistics(self):
+        return self._statistics
+
+    def _run(self, name: str, simplification):
+        clauses = len(self._clauses) + len(self._assigned)
+        start_time = time.perf_counter()
+        simplification()
+        self._statistics[name] = {
+            'time': time.perf_counter() - start_time,
+            'removed_clauses':
+                clauses - len(self._clauses) - len(self._assigned),
+        }
+
+    def _add(self, literals: Iterable[int]):
+        clause = set()
+        for literal in literals:
+            if literal in self._assigned:
+                return
+            if -literal not in self._assigned:
+                clause.add(literal)
+        if any(-literal in clause for literal in clause):
+            return
+        if not clause:
+            self._unsat = True
+        elif len(clause) == 1:
+            self._assign(clause.pop())
+        else:
+            index = self._next_id
+            self._next_id += 1
+            self._clauses[index] = frozenset(clause)
+            for literal in clause:
+                self._occurs[literal].add(index)
+            self._touched.add(index)
+
+    def _remove(self, index: int):
+        for literal in self._clauses.pop(index):
+            self._occurs[literal].discard(index)
+
+    def _strengthen(self, index: int, literal: int):
+        clause = self._clauses[index] - {literal}
+        self._occurs[literal].discard(index)
+        if len(clause) == 1:
+            self._remove(index)
+            self._assign(next(iter(clause)))
+        else:
+            self._clauses[index] = clause
+            self._touched.add(index)
+
+    def _assign(self, literal: int):
+        if -literal in self._assigned:
+            self._unsat = True
+        elif literal not in self._assigned:
+            self._assigned.add(literal)
+            self._pending.append(literal)
+
+    def _propagate(self):
+        while self._pending and not self._unsat:
+            literal = self._pending.pop()
+            for index in list(self._occurs[literal]):
+                self._remove(index)
+            for index in list(self._occurs[-literal]):
+                if index in self._clauses:
+                    self._strengthen(index, -literal)
+
+    def _simplify(self):
+        while self._touched and not self._unsat:
+            touched = sorted(self._touched,
+                             key=lambda index: len(self._clauses.get(
+                                 index, ())))
+            self._touched = set()
+            for index in touched:
+                if index in self._clauses:
+                    self._backward_subsume(index)
+            self._propagate()
+
+    def _backward_subsume(self, index: int):
+        clause = self._clauses[index]
+        occurs = self._occurs
+
+        if self._subsumption:
+            literal = min(clause, key=lambda other: len(occurs[other]))
+            for other in list(occurs[literal]):
+                if other != index and clause <= self._clauses[other]:
+                    self._remove(other)
+
+        if self._self_subsumption:
+            # clause = rest or literal strengthens every clause that holds
+            # rest and the negation of literal by dropping that negation
+            for literal in clause:
+                rest = clause - {literal}
+                for other in list(occurs[-literal]):
+                    if other in self._clauses and \
+                            rest <= self._clauses[other]:
+                        self._strengthen(other, -literal)
+
+    def _eliminate(self):
+        occurs = self._occurs
+        candidates = sorted(
+            (var for var in self._variables if var not in self._frozen),
+            key=lambda var: len(occurs[var]) * len(occurs[-var]))
+
+        for var in candidates:
+            if self._unsat:
+                return
+            positive, negative = occurs[var], occurs[-var]
+            if var in self._assigned or -var in self._assigned or \
+                    not positive and not negative:
+                continue
+            if len(positive) > self._max_occurrences and \
+                    len(negative) > self._max_occurrences:
+                continue
+
+            limit = len(positive) + len(negative) + self._max_growth
+            resolvents = []
+            for pos_index in positive:
+                for neg_index in negative:
+                    resolvent = (self._clauses[pos_index] |
+                                 self._clauses[neg_index]) - {var, -var}
+                    if any(-literal in resolvent for literal in resolvent):
+                        continue
+                    resolvents.append(resolvent)
+                    if len(resolvents) > limit:
+                        break
+                if len(resolvents) > limit:
+                    break
+            if len(resolvents) > limit:
+                continue
+
+            for index in list(positive) + list(negative):
+                clause = self._clauses[index]
+                self._stack.append((var if var in clause else -var,
+                                    tuple(clause)))
+                self._remove(index)
+            self._eliminated.add(var)
+            for resolvent in resolvents:
+                self._add(resolvent)
+            self._propagate()
+            if self._subsumption or self._self_subsumption:
+                self._simplify()
+            else:
+                self._touched.clear()
+
+    def _eliminate_pure_literals(self):
+        occurs = self._occurs
+        candidates = sorted(self._variables - self._frozen, reverse=True)
+        while candidates and not self._unsat:
+            var = candidates.pop()
+            if var in self._eliminated:
+                continue
+            for literal in (var, -var):
+                if occurs[literal] and not occurs[-literal]:
+                    break
+            else:
+                continue
+            # like an elimination without resolvents: the clauses are
+            # satisfied by literal, which extend() sets when they are not
+            neighbours = set()
+            for index in list(occurs[literal]):
+                clause = self._clauses[index]
+                self._stack.append((literal, tuple(clause)))
+                neighbours.update(abs(other) for other in clause)
+                self._remove(index)
+            self._eliminated.add(var)
+            # dropping those clauses can leave their other literals pure
+            candidates.extend(neighbours - self._frozen - {var})
+
+    def _probe_literal(self, literal: int) -> Optional[Set[int]]:
+        # propagates literal over the current clauses without changing
+        # them, returns the implied literals or None on a conflict
+        implied = {literal}
+        queue = [literal]
+        while queue:
+            false_literal = -queue.pop()
+            for index in self._occurs[false_literal]:
+                unassigned = []
+                for other in self._clauses[index]:
+                    if other in implied:
+                        break
+                    if -other not in implied:
+                        unassigned.append(other)
+                else:
+                    if not unassigned:
+                        return None
+                    if len(unassigned) == 1:
+                        implied.add(unassigned[0])
+                        queue.append(unassigned[0])
+        return implied
+
+    def _probe(self):
+        for var in sorted(self._variables):
+            if self._unsat:
+                return
+            if var in self._assigned or -var in self._assigned or \
+                    not self._occurs[var] and not self._occurs[-var]:
+                continue
+            positive = self._probe_literal(var)
+            if positive is None:
+                self._assign(-var)
+            else:
+                negative = self._probe_literal(-var)
+                if negative is None:
+                    self._assign(var)
+                else:
+                    for literal in positive & negative:
+                        self._assign(literal)
+            self._propagate()
+
+    def _implication_components(self) -> List[List[int]]:
+        graph = defaultdict(list)
+        for clause in self._clauses.values():
+            if len(clause) == 2:
+                first, second = clause
+                graph[-first].append(second)
+                graph[-second].append(first)
+
+        # Tarjan's algorithm, iterative so that long implication chains
+        # do not hit the recursion limit
+        index_of = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        components = []
+        counter = 0
+        for root in list(graph):
+            if root in index_of:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, position = work.pop()
+                if position == 0:
+                    index_of[node] = lowlink[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                successors = graph.get(node, ())
+                if position < len(successors):
+                    work.append((node, position + 1))
+                    successor = successors[position]
+                    if successor not in index_of:
+                        work.append((successor, 0))
+                    elif successor in on_stack:
+                        lowlink[node] = min(lowlink[node],
+                                            index_of[successor])
+                    continue
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1:
+                        components.append(component)
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+        return components
+
+    def _substitute_equivalences(self):
+        replacement = {}
+        for component in self._implication_components():
+            members = set(component)
+            if any(-literal in members for literal in members):
+                self._unsat = True
+                return
+            # the mirrored component of the negations is handled as well
+            if any(abs(literal) in replacement for literal in component):
+                continue
+            frozen = [literal for literal in component
+                      if abs(literal) in self._frozen]
+            representative = min(frozen or component, key=abs)
+            for literal in component:
+                if literal == representative or abs(literal) in self._frozen:
+                    continue
+                replacement[abs(literal)] = representative \
+                    if literal > 0 else -representative
+
+        for var, literal in replacement.items():
+            self._stack.append((var, (var, -literal)))
+            self._stack.append((-var, (-var, literal)))
+            self._eliminated.add(var)
+            for index in list(self._occurs[var]) + list(self._occurs[-var]):
+                if index not in self._clauses:
+                    continue
+                clause = self._clauses[index]
+                self._remove(index)
+                self._add([literal if other == var else
+                           -literal if other == -var else other
+                           for other in clause])
+        self._propagate()
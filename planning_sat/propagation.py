@@ -0,0 +1,271 @@
+"""Propagation
+
+Description:
+    This module keeps the clause database and the assignment trail shared
+    by the solvers and runs two-watched-literal unit propagation over it
+
+License:
+    Copyright 2021 Debby Nirwan
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+from planning_sat.heuristics import HEURISTICS
+from planning_sat.statistics import SolverStatistics
+from itertools import chain
+from typing import Callable, List, Optional
+import time
+
+
+class PropagationEngine(object):
+    """Clause database with an assignment trail.
+
+    Assignments are pushed on the trail, decision levels are marked by the
+    trail position where they start, and backtracking pops the trail back
+    to such a mark. Watch lists need no restoring on backtrack.
+    """
+
+    # activity-based variable order, told about every unassigned variable
+    _order = None
+    # counters of the last solve, and a callback to report them while the
+    # solve runs, every _progress_interval conflicts and every
+    # _progress_interval decisions
+    _statistics = None
+    _progress = None
+    _progress_interval = 1000
+    _propagations = 0
+
+    def _set_heuristic(self, heuristic: str, static: str):
+        if heuristic == static:
+            self._order = None
+        elif heuristic in HEURISTICS:
+            self._order = HEURISTICS[heuristic]()
+        else:
+            raise ValueError(f"unknown decision heuristic {heuristic}")
+
+    def _set_progress(self, progress: Callable[[SolverStatistics], None],
+                      interval: int):
+        self._progress = progress
+        self._progress_interval = interval
+
+    @property
+    def statistics(self) -> Optional[SolverStatistics]:
+        """Counters of the last solve. While it runs, decisions and
+        conflicts are current, propagations and time are refreshed
+        whenever progress is reported."""
+        return self._statistics
+
+    def _start_statistics(self):
+        self._statistics = SolverStatistics()
+        self._statistics_start = (time.perf_counter(), self._propagations)
+
+    def _update_statistics(self):
+        start_time, propagations = self._statistics_start
+        self._statistics.time = time.perf_counter() - start_time
+        self._statistics.propagations = self._propagations - propagations
+
+    def _on_conflict(self):
+        statistics = self._statistics
+        statistics.conflicts += 1
+        if self._progress is not None and \
+                statistics.conflicts % self._progress_interval == 0:
+            self._report_progress()
+
+    def _on_decision(self):
+        # a propagation-bound search makes few conflicts, its decisions
+        # still get reported
+        statistics = self._statistics
+        statistics.decisions += 1
+        if self._progress is not None and \
+                statistics.decisions % self._progress_interval == 0:
+            self._report_progress()
+
+    def _report_progress(self):
+        self._update_statistics()
+        self._progress(self._statistics)
+
+    def _load(self, formulas: List[List[int]], model=None) -> bool:
+        num_vars = max((abs(literal) for clause in formulas
+                        for literal in clause), default=0)
+        if model:
+            num_vars = max(num_vars, max(abs(literal) for literal in model))
+            formulas = chain(formulas, ([literal] for literal in model))
+        self._reset(num_vars)
+        return self._add_clauses(formulas)
+
+    def _reset(self, num_vars: int):
+        self._num_vars = num_vars
+        # indexed by signed literal: negative literals wrap around to the
+        # upper half of the list, so both polarities of every variable
+        # get their own watch list
+        self._watches = [[] for _ in range(2 * num_vars + 1)]
+        self._clauses = []
+        self._free = []
+        self._assigns = [0] * (num_vars + 1)
+        self._level = [0] * (num_vars + 1)
+        self._reason = [None] * (num_vars + 1)
+        self._seen = [False] * (num_vars + 1)
+        # last polarity of every variable, kept when it is unassigned
+        self._phase = [-1] * (num_vars + 1)
+        self._trail = []
+        self._trail_lim = []
+        self._qhead = 0
+        if self._order is not None:
+            self._order.reset(num_vars)
+
+    def _grow(self, num_vars: int):
+        if num_vars <= self._num_vars:
+            return
+        watches = [[] for _ in range(2 * num_vars + 1)]
+        for var in range(1, self._num_vars + 1):
+            watches[var] = self._watches[var]
+            watches[-var] = self._watches[-var]
+        self._watches = watches
+        extra = num_vars - self._num_vars
+        self._assigns += [0] * extra
+        self._level += [0] * extra
+        self._reason += [None] * extra
+        self._seen += [False] * extra
+        self._phase += [-1] * extra
+        self._num_vars = num_vars
+        if self._order is not None:
+            self._order.grow(num_vars)
+
+    def _add_clauses(self, formulas: List[List[int]]) -> bool:
+        # clauses are added at decision level 0, where assignments are
+        # final: satisfied clauses are dropped, false literals removed
+        units = []
+        for clause in formulas:
+            clause = list(dict.fromkeys(clause))
+            if any(-literal in clause for literal in clause):
+                continue
+            if any(self._value(literal) > 0 for literal in clause):
+                continue
+            clause = [literal for literal in clause
+                      if self._value(literal) == 0]
+            if not clause:
+                return False
+            if len(clause) == 1:
+                units.append(clause[0])
+            else:
+                self._attach(clause)
+
+        for literal in units:
+            value = self._value(literal)
+            if value < 0:
+                return False
+            if value == 0:
+                self._enqueue(literal, None)
+        return True
+
+    def _attach(self, clause: List[int]) -> int:
+        if self._free:
+            index = self._free.pop()
+            self._clauses[index] = clause
+        else:
+            index = len(self._clauses)
+            self._clauses.append(clause)
+        self._watches[clause[0]].append(index)
+        self._watches[clause[1]].append(index)
+        return index
+
+    def _detach(self, indices: List[int]):
+        removed = set(indices)
+        watched = set()
+        for index in removed:
+            clause = self._clauses[index]
+            watched.add(clause[0])
+            watched.add(clause[1])
+            self._clauses[index] = None
+        for literal in watched:
+            self._watches[literal] = [index for index in self._watches[literal]
+                                      if index not in removed]
+        self._free.extend(removed)
+
+    def _locked(self, index: int) -> bool:
+        # a clause that is the reason of a current assignment must stay
+        first = self._clauses[index][0]
+        return self._reason[abs(first)] == index and self._value(first) > 0
+
+    def _value(self, literal: int) -> int:
+        if literal > 0:
+            return self._assigns[literal]
+        return -self._assigns[-literal]
+
+    def _enqueue(self, literal: int, reason: Optional[int]):
+        var = abs(literal)
+        self._assigns[var] = 1 if literal > 0 else -1
+        self._level[var] = len(self._trail_lim)
+        self._reason[var] = reason
+        self._trail.append(literal)
+
+    def _decide(self, literal: int):
+        self._trail_lim.append(len(self._trail))
+        self._enqueue(literal, None)
+
+    def _propagate(self) -> Optional[int]:
+        trail = self._trail
+        clauses = self._clauses
+        watches = self._watches
+        assigns = self._assigns
+
+        while self._qhead < len(trail):
+            false_literal = -trail[self._qhead]
+            self._qhead += 1
+            self._propagations += 1
+            watch_list = watches[false_literal]
+            watches[false_literal] = kept = []
+
+            for position, index in enumerate(watch_list):
+                clause = clauses[index]
+                # keep the falsified watch in the second slot
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+                first = clause[0]
+                first_value = assigns[first] if first > 0 \
+                    else -assigns[-first]
+                if first_value > 0:
+                    kept.append(index)
+                    continue
+
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    value = assigns[literal] if literal > 0 \
+                        else -assigns[-literal]
+                    if value >= 0:
+                        clause[1], clause[k] = literal, false_literal
+                        watches[literal].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if first_value < 0:
+                        kept.extend(watch_list[position + 1:])
+                        self._qhead = len(trail)
+                        return index
+                    self._enqueue(first, index)
+
+        return None
+
+    def _cancel_until(self, level: int):
+        if len(self._trail_lim) <= level:
+            return
+        limit = self._trail_lim[level]
+        variables = [abs(literal) for literal in self._trail[limit:]]
+        for var in variables:
+            self._phase[var] = self._assigns[var]
+            self._assigns[var] = 0
+            self._reason[var] = None
+        if self._order is not None:
+            self._order.unassigned(variables)
+        del self._trail[limit:]
+        del self._trail_lim[level:]
+        self._qhead = limit
@@ -0,0 +1,123 @@
+"""Restarts
+
+Description:
+    This module provides the restart schedules (Luby and Glucose-style
+    LBD moving average) used by the CDCL solver
+
+License:
+    Copyright 2021 Debby Nirwan
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+from collections import deque
+
+
+def luby(index: int) -> int:
+    """Returns the index-th element (from 0) of the Luby sequence
+    1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ...
+    """
+    size, sequence = 1, 0
+    while size < index + 1:
+        sequence += 1
+        size = 2 * size + 1
+    while size - 1 != index:
+        size = (size - 1) >> 1
+        sequence -= 1
+        index = index % size
+    return 1 << sequence
+
+
+class NoRestarts(object):
+
+    def reset(self):
+        pass
+
+    def on_conflict(self, lbd: int):
+        pass
+
+    def should_restart(self) -> bool:
+        return False
+
+    def on_restart(self):
+        pass
+
+
+class LubyRestarts(NoRestarts):
+    """Restarts after unit * luby(i) conflicts for the i-th restart."""
+
+    def __init__(self, unit=100):
+        self._unit = unit
+        self._restarts = 0
+        self._conflicts = 0
+
+    def reset(self):
+        self._restarts = 0
+        self._conflicts = 0
+
+    def on_conflict(self, lbd: int):
+        self._conflicts += 1
+
+    def should_restart(self) -> bool:
+        return self._conflicts >= self._unit * luby(self._restarts)
+
+    def on_restart(self):
+        self._restarts += 1
+        self._conflicts = 0
+
+
+class GlucoseRestarts(NoRestarts):
+    """Restarts when the recently learned clauses are worse than average.
+
+    Compares the moving average of the LBD (literal block distance) of the
+    last window learned clauses against the average over the whole solve
+    and restarts when the recent average scaled by margin exceeds it.
+    """
+
+    def __init__(self, window=50, margin=0.8):
+        self._margin = margin
+        self._recent = deque(maxlen=window)
+        self._recent_sum = 0
+        self._total_sum = 0
+        self._conflicts = 0
+
+    def reset(self):
+        self._recent.clear()
+        self._recent_sum = 0
+        self._total_sum = 0
+        self._conflicts = 0
+
+    def on_conflict(self, lbd: int):
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_sum -= self._recent[0]
+        self._recent.append(lbd)
+        self._recent_sum += lbd
+        self._total_sum += lbd
+        self._conflicts += 1
+
+    def should_restart(self) -> bool:
+        if len(self._recent) < self._recent.maxlen:
+            return False
+        recent_average = self._recent_sum / len(self._recent)
+        total_average = self._total_sum / self._conflicts
+        return recent_average * self._margin > total_average
+
+    def on_restart(self):
+        self._recent_sum = 0
+        self._recent.clear()
+
+
+RESTARTS = {
+    'none': NoRestarts,
+    'luby': LubyRestarts,
+    'glucose': GlucoseRestarts,
+}
@@ -0,0 +1,60 @@
+"""Statistics
+
+Description:
+    This module provides the counters the solvers keep about their
+    search, to tell a propagation-bound solve from a search-bound one
+
+License:
+    Copyright 2021 Debby Nirwan
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+FIELDS = ['decisions', 'propagations', 'conflicts', 'restarts',
+          'learned_clauses', 'pure_literals', 'max_decision_level', 'time']
+
+
+class SolverStatistics(object):
+    """Counters of a single solve.
+
+    propagations counts the literals taken off the trail and propagated,
+    learned_clauses includes learned unit clauses, pure_literals counts
+    the literals assigned because their negation occurred in no
+    unsatisfied clause and time is in seconds.
+    """
+
+    def __init__(self):
+        self.decisions = 0
+        self.propagations = 0
+        self.conflicts = 0
+        self.restarts = 0
+        self.learned_clauses = 0
+        self.pure_literals = 0
+        self.max_decision_level = 0
+        self.time = 0.0
+
+    def __repr__(self):
+        counters = ', '.join(f"{name}={getattr(self, name)}"
+                             for name in FIELDS[:-1])
+        return f"SolverStatistics({counters}, time={self.time:0.4f})"
+
+    @property
+    def propagations_per_second(self) -> float:
+        if self.time <= 0:
+            return 0.0
+        return self.propagations / self.time
+
+    def as_dict(self) -> dict:
+        counters = {name: getattr(self, name) for name in FIELDS}
+        counters['propagations_per_second'] = self.propagations_per_second
+        return counters
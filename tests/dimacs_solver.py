@@ -0,0 +1,45 @@
+"""Stand-in for a native DIMACS solver in the backend tests: solves the
+DIMACS file named on the command line, or standard input, with CDCL and
+answers in the format of the SAT competitions"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from planning_sat.cdcl import CDCL  # noqa: E402
+
+
+def main() -> int:
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as cnf:
+            text = cnf.read()
+    else:
+        text = sys.stdin.read()
+
+    formulas = []
+    clause = []
+    for line in text.splitlines():
+        if line.startswith(('c', 'p')):
+            continue
+        for literal in map(int, line.split()):
+            if literal == 0:
+                formulas.append(clause)
+                clause = []
+            else:
+                clause.append(literal)
+
+    sat, model = CDCL()(formulas)
+    if not sat:
+        print("s UNSATISFIABLE")
+        return 20
+    print("s SATISFIABLE")
+    literals = sorted(model, key=abs) + [0]
+    # values are spread over several 'v' lines as real solvers do
+    for start in range(0, len(literals), 10):
+        print("v " + " ".join(map(str, literals[start:start + 10])))
+    return 10
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+from planning_sat.encoder import PlanningProblemEncoder
+
+
+def satisfies(clauses, model):
+    return all(any(literal in model for literal in clause)
+               for clause in clauses)
+
+
+def pigeonhole(pigeons):
+    # pigeons in one hole fewer, unsatisfiable and hard for resolution
+    holes = pigeons - 1
+    var = [[pigeon * holes + hole + 1 for hole in range(holes)]
+           for pigeon in range(pigeons)]
+    clauses = [list(row) for row in var]
+    for hole in range(holes):
+        for i in range(pigeons):
+            for j in range(i + 1, pigeons):
+                clauses.append([-var[i][hole], -var[j][hole]])
+    return clauses
+
+
+# lengths of the dock-worker-robot problem around its shortest plan, and
+# whether they have one
+DWR_HORIZONS = ((5, False), (6, True))
+
+
+def dwr_encoder(length, **options):
+    return PlanningProblemEncoder("domain/dock-worker-robot-domain.pddl",
+                                  "domain/dock-worker-robot-problem.pddl",
+                                  length, **options)
+
+
+def dwr_formulas(length):
+    return dwr_encoder(length).integer_formulas
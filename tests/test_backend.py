@@ -0,0 +1,88 @@
+import sys
+
+import pytest
+
+from planning_sat.backend import ExternalSolver, SolverBackend
+from planning_sat.budget import Budget, UNKNOWN
+from planning_sat.cdcl import CDCL
+from planning_sat.cube_and_conquer import CubeAndConquer
+from planning_sat.davis_putnam import DavisPutnam
+from planning_sat.encoder import PlanningProblemEncoder
+from planning_sat.planner import Planner
+from planning_sat.portfolio import Portfolio
+from tests.helpers import dwr_encoder, pigeonhole, satisfies
+
+STAND_IN = [sys.executable, "tests/dimacs_solver.py"]
+
+
+class TestBackend:
+
+    def test_solvers_are_backends(self):
+        for solver in (DavisPutnam(), CDCL(), Portfolio(), CubeAndConquer(),
+                       ExternalSolver(STAND_IN)):
+            assert isinstance(solver, SolverBackend)
+
+    def test_callables_are_not_backends(self):
+        assert not isinstance(lambda formulas: (True, set()), SolverBackend)
+        assert not isinstance(print, SolverBackend)
+        with pytest.raises(TypeError):
+            SolverBackend()
+
+    def test_external_solver(self):
+        encoded_pp = dwr_encoder(6)
+        formulas = encoded_pp.integer_formulas
+        for stdin in (False, True):
+            result, model = ExternalSolver(STAND_IN, stdin)(formulas)
+
+            assert result
+            assert satisfies(formulas, model)
+            assert len(encoded_pp.decode_plan(model)) >= 6
+
+        result, model = ExternalSolver(STAND_IN)(pigeonhole(4))
+        assert result is False and model is None
+
+    def test_clause_objects_and_partial_model(self):
+        encoded_pp = PlanningProblemEncoder("domain/simple-domain.pddl",
+                                            "domain/simple-problem.pddl")
+        formulas = encoded_pp.propositional_formulas
+        result, model = ExternalSolver(STAND_IN)(formulas)
+        expected, expected_model = DavisPutnam()(formulas)
+
+        assert result == expected
+        assert len(model) == len(expected_model)
+
+        result, model = ExternalSolver(STAND_IN)([[1, 2]], model={-1})
+        assert result and model == {-1, 2}
+
+    def test_output_parsing(self):
+        parse = ExternalSolver._parse
+
+        assert parse("c comment\ns SATISFIABLE\nv 1 -2\nv 0\n", 10, 3) == \
+            (True, {1, -2, -3})
+        assert parse("s UNSATISFIABLE\n", 20, 3) == (False, None)
+        assert parse("", 20, 3) == (False, None)
+        assert parse("s UNKNOWN\n", 0, 3) == (UNKNOWN, None)
+
+    def test_time_limit(self):
+        result, model = ExternalSolver(STAND_IN)(
+            pigeonhole(10), budget=Budget(time_limit=0.5))
+
+        assert result is UNKNOWN
+        assert model is None
+
+    def test_planner_backend(self):
+        for backend, schedule in ((CDCL(), 'sequential'),
+                                  (ExternalSolver(STAND_IN), 'exponential')):
+            planner = Planner("domain/dock-worker-robot-domain.pddl",
+                              "domain/dock-worker-robot-problem.pddl",
+                              schedule, max_length=10, backend=backend)
+            plan, timings = planner()
+
+            assert plan is not None and len(plan) >= 6
+            assert not any(timings[length]['result']
+                           for length in timings if length < 6)
+
+        with pytest.raises(ValueError):
+            Planner("domain/dock-worker-robot-domain.pddl",
+                    "domain/dock-worker-robot-problem.pddl", 'rintanen-b',
+                    backend=CDCL())
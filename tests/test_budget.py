@@ -0,0 +1,53 @@
+import threading
+
+from planning_sat.budget import Budget, CancelToken, UNKNOWN
+from planning_sat.cdcl import CDCL
+from planning_sat.davis_putnam import DavisPutnam
+from tests.helpers import dwr_formulas, pigeonhole
+
+
+class TestBudget:
+
+    def test_limits(self):
+        budget = Budget(conflicts=2, decisions=3)
+        budget.start()
+        assert not budget.exhausted(2, 3)
+        assert budget.exhausted(3, 0)
+        assert budget.exhausted(0, 4)
+
+        token = CancelToken()
+        budget = Budget(cancel_token=token)
+        budget.start()
+        assert not budget.exhausted(0, 0)
+        token.cancel()
+        assert budget.exhausted(0, 0)
+
+        budget = Budget(time_limit=0)
+        budget.start()
+        assert budget.exhausted(0, 0)
+
+    def test_solvers_give_up(self):
+        formulas = pigeonhole(7)
+        for solver in (CDCL(), DavisPutnam()):
+            for budget in (Budget(conflicts=10), Budget(decisions=10),
+                           Budget(time_limit=0)):
+                result, model = solver(formulas, budget=budget)
+
+                assert result is UNKNOWN
+                assert model is None
+
+    def test_cancel_from_another_thread(self):
+        token = CancelToken()
+        timer = threading.Timer(0.05, token.cancel)
+        timer.start()
+        result, model = CDCL()(pigeonhole(9),
+                               budget=Budget(cancel_token=token))
+        timer.join()
+
+        assert result is UNKNOWN
+
+    def test_budget_is_enough(self):
+        result, model = CDCL()(dwr_formulas(6),
+                               budget=Budget(time_limit=60))
+
+        assert result
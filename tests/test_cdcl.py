@@ -0,0 +1,106 @@
+from planning_sat.cdcl import CDCL
+from planning_sat.encoder import Clause, Operator
+from tests.helpers import DWR_HORIZONS, dwr_encoder, dwr_formulas, satisfies
+
+
+class TestCDCL:
+
+    def test_cdcl(self):
+        forms = []
+        clause_1 = Clause(('D',))
+        forms.append(clause_1)
+        clause_2 = Clause(('not', 'D'))
+        clause_2.add(('A',), Operator.OR)
+        clause_2.add(('not', 'B'), Operator.OR)
+        forms.append(clause_2)
+        clause_3 = Clause(('not', 'D'))
+        clause_3.add(('not', 'A'), Operator.OR)
+        clause_3.add(('not', 'B'), Operator.OR)
+        forms.append(clause_3)
+
+        cdcl = CDCL()
+        result, final_model = cdcl(forms)
+
+        assert result
+        assert ('D',) in final_model
+        assert ('not', 'B') in final_model
+
+    def test_unsatisfiable(self):
+        # three pigeons do not fit into two holes
+        holes = [[1, 2], [3, 4], [5, 6]]
+        clauses = [list(pigeon) for pigeon in holes]
+        for hole in range(2):
+            for i in range(3):
+                for j in range(i + 1, 3):
+                    clauses.append([-holes[i][hole], -holes[j][hole]])
+
+        result, final_model = CDCL()(clauses)
+
+        assert not result
+        assert final_model is None
+
+    def test_planning_horizon(self):
+        for length, expected in DWR_HORIZONS:
+            formulas = dwr_formulas(length)
+            for heuristic in ('order', 'vsids', 'evsids'):
+                result, final_model = CDCL(heuristic)(formulas)
+
+                assert result == expected
+                if result:
+                    assert satisfies(formulas, final_model)
+
+    def test_restarts_and_phase_saving(self):
+        formulas = dwr_formulas(8)
+        for restarts in ('none', 'luby', 'glucose'):
+            for phase_saving in (True, False):
+                cdcl = CDCL(restarts=restarts, phase_saving=phase_saving)
+                result, final_model = cdcl(formulas)
+
+                assert result
+                assert satisfies(formulas, final_model)
+
+    def test_clause_database_reduction(self):
+        cdcl = CDCL(reduce_interval=5, core_lbd=1)
+        result, final_model = cdcl(dwr_formulas(5))
+
+        assert not result
+
+    def test_incremental(self):
+        cdcl = CDCL()
+        cdcl.add_clauses([[1, 2], [-1, 3]])
+
+        result, final_model = cdcl.solve([-3])
+        assert result
+        assert {-3, -1, 2} <= final_model
+        result, final_model = cdcl.solve([-2, -3])
+        assert not result
+        cdcl.add_clauses([[-2, 4]])
+        result, final_model = cdcl.solve([-4])
+        assert result
+        assert {-4, -2, 1, 3} <= final_model
+        cdcl.add_clauses([[-3], [-4]])
+        assert not cdcl.solve()[0]
+
+    def test_clause_generator(self):
+        for length, expected in DWR_HORIZONS:
+            encoded_pp = dwr_encoder(length, direct=True)
+            cdcl = CDCL()
+            cdcl.add_clauses(encoded_pp.iter_clauses())
+
+            assert cdcl.solve()[0] == expected
+            assert CDCL()(encoded_pp.iter_clauses())[0] == expected
+
+    def test_incremental_planning_horizon(self):
+        encoded_pp = dwr_encoder(0)
+        cdcl = CDCL()
+        cdcl.add_clauses(encoded_pp.initial_formulas())
+
+        step = 0
+        while True:
+            result, final_model = cdcl.solve(encoded_pp.goal_literals(step))
+            if result:
+                break
+            cdcl.add_clauses(encoded_pp.step_formulas(step))
+            step += 1
+
+        assert step == 6
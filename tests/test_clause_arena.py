@@ -0,0 +1,36 @@
+import pickle
+
+from planning_sat.cdcl import CDCL
+from planning_sat.clause_arena import ClauseArena
+from planning_sat.encoder import intern_formulas
+from tests.helpers import dwr_encoder
+
+
+class TestClauseArena:
+
+    def test_clauses(self):
+        formulas = [[1, -2], [3], [-1, 2, -3]]
+        arena = ClauseArena(formulas)
+        index = arena.append([4, -1])
+
+        assert index == 3
+        assert len(arena) == 4
+        assert list(arena) == formulas + [[4, -1]]
+        assert arena[1] == [3] and arena[-1] == [4, -1]
+        assert arena.size(2) == 3
+        assert list(arena.offsets) == [0, 2, 3, 6, 8]
+        assert arena.num_vars == 4
+        assert list(pickle.loads(pickle.dumps(arena))) == list(arena)
+
+    def test_encoder_arena(self):
+        encoded_pp = dwr_encoder(6)
+        arena = encoded_pp.clause_arena
+
+        assert list(arena) == encoded_pp.integer_formulas
+        assert arena.nbytes < 40 * len(arena)
+
+        # integer input reaches the solvers without a copy
+        assert intern_formulas(arena)[0] is arena
+        result, model = CDCL()(arena)
+        assert result
+        assert len(encoded_pp.decode_plan(model)) >= 6
@@ -0,0 +1,27 @@
+from planning_sat.clause_database import LearnedClauseDatabase
+
+
+class TestLearnedClauseDatabase:
+
+    def test_reduce(self):
+        database = LearnedClauseDatabase(interval=2, interval_increment=1,
+                                         core_lbd=2)
+        database.add(0, 2)
+        database.add(1, 5)
+        database.add(2, 4)
+        database.add(3, 3)
+        database.add(4, 6)
+        database.bump(2)
+        database.on_conflict()
+        assert not database.should_reduce()
+        database.on_conflict()
+        assert database.should_reduce()
+
+        removed = database.reduce(lambda index: index == 4)
+
+        # the glue clause and the locked clause stay, the worst half of
+        # the remaining clauses by LBD goes
+        assert removed == [1]
+        assert 0 in database and 4 in database
+        assert len(database) == 4
+        assert not database.should_reduce()
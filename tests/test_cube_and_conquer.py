@@ -0,0 +1,80 @@
+from planning_sat.budget import Budget, UNKNOWN
+from planning_sat.cube_and_conquer import CubeAndConquer, Lookahead
+from planning_sat.cdcl import CDCL
+from tests.helpers import DWR_HORIZONS, dwr_encoder, pigeonhole, satisfies
+import sys
+
+
+class TestLookahead:
+
+    def test_cubes_are_disjoint(self):
+        formulas = [[1, 2, 3], [-1, 4], [-2, 4, 5], [-4, -5, 6], [3, -6]]
+        cubes = Lookahead()(formulas, 3)
+
+        assert len(cubes) > 1
+        for i, cube in enumerate(cubes):
+            assert len(set(abs(literal) for literal in cube)) == len(cube)
+            for other in cubes[i + 1:]:
+                assert any(-literal in other for literal in cube)
+
+    def test_refuted_cubes_are_dropped(self):
+        # 1 fails at once, and neither value of 2 survives under -1
+        formulas = [[-1, 2], [-1, -2], [1, 3], [1, -3, 4], [1, -3, -4]]
+
+        assert Lookahead()(formulas, 2) == []
+        assert Lookahead()([[1], [-1]], 2) is None
+
+    def test_many_failed_literals(self):
+        # every odd variable fails, more of them than the recursion limit
+        pairs = sys.getrecursionlimit() + 100
+        formulas = [clause for var in range(1, 2 * pairs, 2)
+                    for clause in ([-var, var + 1], [-var, -(var + 1)])]
+        cubes = Lookahead()(formulas, 2)
+
+        assert len(cubes) == 4
+        for cube in cubes:
+            assert all(-var in cube for var in range(1, 2 * pairs, 2))
+            assert len(cube) == pairs + 2
+
+    def test_candidates(self):
+        formulas = [[1, 2, 3], [-1, 4], [-2, 4, 5], [-4, -5, 6], [3, -6]]
+        cubes = Lookahead()(formulas, 2, candidates=[5, 6])
+
+        assert all(abs(literal) in (5, 6) for cube in cubes
+                   for literal in cube)
+
+
+class TestCubeAndConquer:
+
+    def test_planning_horizon(self):
+        for length, expected in DWR_HORIZONS:
+            encoded_pp = dwr_encoder(length)
+            formulas = encoded_pp.integer_formulas
+            actions = encoded_pp.action_variables(0) + \
+                encoded_pp.action_variables(1)
+            solver = CubeAndConquer(workers=2, candidates=actions)
+            result, final_model = solver(formulas)
+
+            assert result == expected
+            assert all(abs(literal) in actions for cube in solver.cubes
+                       for literal in cube)
+            if result:
+                assert satisfies(formulas, final_model)
+
+    def test_agrees_with_cdcl(self):
+        formulas = pigeonhole(5)
+        formulas_sat = formulas[1:]
+        for clauses in (formulas, formulas_sat):
+            expected, _ = CDCL()(clauses)
+            result, model = CubeAndConquer(workers=2)(clauses)
+
+            assert result == expected
+            if result:
+                assert satisfies(clauses, model)
+
+    def test_time_limit(self):
+        result, model = CubeAndConquer(workers=2)(
+            pigeonhole(10), budget=Budget(time_limit=0.2))
+
+        assert result is UNKNOWN
+        assert model is None
@@ -1,5 +1,6 @@
 from planning_sat.davis_putnam import DavisPutnam
 from planning_sat.encoder import Clause, Operator
+from tests.helpers import dwr_formulas
 
 
 model = {('not', 'B'), ('not', 'A'), ('D',)}
@@ -32,3 +33,64 @@ class TestDPLL:
 
         assert result_dp
         assert final_model == model
+
+    def test_dpll_integer_formulas(self):
+        forms = [[4], [-4, 1, -2], [-4, -1, -2], [-4, -1, 2], [4, 1]]
+
+        davis_putnam = DavisPutnam()
+        result_dp, final_model = davis_putnam(forms)
+
+        assert result_dp
+        assert final_model == {4, -1, -2}
+        assert davis_putnam(clause for clause in forms) == \
+            (True, {4, -1, -2})
+        assert not davis_putnam(clause for clause in [[1], [-1]])[0]
+
+    def test_dpll_unsatisfiable(self):
+        davis_putnam = DavisPutnam()
+        result_dp, final_model = davis_putnam([[1, 2], [-1], [-2]])
+
+        assert not result_dp
+        assert final_model is None
+
+    def test_dpll_planning_horizon(self):
+        formulas = dwr_formulas(6)
+
+        davis_putnam = DavisPutnam()
+        result_dp, final_model = davis_putnam(formulas)
+
+        assert result_dp
+        assert all(any(literal in final_model for literal in clause)
+                   for clause in formulas)
+
+    def test_dpll_deep_search(self):
+        # every clause needs its own decision, far beyond the
+        # interpreter's recursion limit
+        forms = [[-(2 * i + 1), 2 * i + 2] for i in range(3000)]
+
+        davis_putnam = DavisPutnam()
+        result_dp, final_model = davis_putnam(forms)
+
+        assert result_dp
+        assert len(final_model) == 6000
+
+    def test_dpll_pure_literals(self):
+        # 3 only occurs positively, and once 1 is decided so does 2
+        forms = [[1, 3], [-1, 2, 3], [1, -2, 4], [-2, -4, 5], [-5, 2, -1]]
+
+        davis_putnam = DavisPutnam(pure_literals=True)
+        result_dp, final_model = davis_putnam(forms)
+
+        assert result_dp
+        assert 3 in final_model
+        assert all(any(literal in final_model for literal in clause)
+                   for clause in forms)
+        assert davis_putnam.statistics.pure_literals > 0
+        plain = DavisPutnam()
+        plain(forms)
+        assert davis_putnam.statistics.decisions < \
+            plain.statistics.decisions
+
+        result_dp, final_model = DavisPutnam(pure_literals=True)(
+            [[1, 2], [-1, 2], [1, -2], [-1, -2]])
+        assert not result_dp
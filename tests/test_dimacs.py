@@ -0,0 +1,39 @@
+from planning_sat.cdcl import CDCL
+from planning_sat.dimacs import read_dimacs, read_encoding, write_dimacs, \
+    write_encoding
+from planning_sat.encoder import decode_plan
+from tests.helpers import dwr_encoder
+
+
+class TestDimacs:
+
+    def test_write_and_read(self, tmp_path):
+        formulas = [[1, -2], [3], [-1, 2, -3]]
+        for name in ("formulas.cnf", "formulas.cnf.gz"):
+            path = str(tmp_path / name)
+            write_dimacs(path, (clause for clause in formulas),
+                         comments=["three clauses"])
+
+            assert list(read_dimacs(path)) == formulas
+
+        with open(path[:-3]) as cnf:
+            assert cnf.read() == "c three clauses\np cnf 3 3\n" \
+                                 "1 -2 0\n3 0\n-1 2 -3 0\n"
+
+    def test_read_other_layouts(self, tmp_path):
+        path = tmp_path / "formulas.cnf"
+        path.write_text("c header\np cnf 3 3\n1 -2\n 0 3 0\n"
+                        "c in between\n-1 2 -3 0\n%\n0\n")
+
+        assert list(read_dimacs(str(path))) == [[1, -2], [3], [-1, 2, -3]]
+
+    def test_encoding(self, tmp_path):
+        encoded_pp = dwr_encoder(6)
+        path = str(tmp_path / "dwr.cnf.gz")
+        write_encoding(path, encoded_pp)
+        arena, pool = read_encoding(path)
+
+        assert list(arena) == list(encoded_pp.iter_clauses())
+        assert len(pool) == len(encoded_pp.variable_pool)
+        result, model = CDCL()(arena)
+        assert decode_plan(model, pool) == encoded_pp.decode_plan(model)
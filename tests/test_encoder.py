@@ -1,5 +1,10 @@
-from planning_sat.encoder import PlanningProblemEncoder, Clause, Operator
+from planning_sat.cdcl import CDCL
+from planning_sat.encoder import PlanningProblemEncoder, Clause, Operator, \
+    VariablePool
+from planning_sat.pddl_adapter import PlanningProblem
 from pddlpy.pddl import Operator as Op
+import pytest
+from tests.helpers import dwr_encoder
 
 
 formulas = [Clause(('atl', 'rob', 'loc1', '0')),
@@ -60,3 +65,132 @@ class TestEncoder:
                                             "domain/simple-problem.pddl")
         pp = encoded_pp.propositional_formulas
         assert len(pp) == len(formulas)
+
+    def test_integer_formulas(self):
+        encoded_pp = PlanningProblemEncoder("domain/simple-domain.pddl",
+                                            "domain/simple-problem.pddl")
+        pool = encoded_pp.variable_pool
+        int_formulas = encoded_pp.integer_formulas
+        assert len(int_formulas) == len(formulas)
+        assert len(pool) == 6
+        for clause, int_clause in zip(encoded_pp.propositional_formulas,
+                                      int_formulas):
+            assert pool.encode(clause) == int_clause
+            assert all(0 < abs(literal) <= len(pool)
+                       for literal in int_clause)
+
+    def test_direct_encoding(self):
+        for length in (0, 1, 4):
+            encoded_pp = dwr_encoder(length, direct=True)
+            int_formulas = encoded_pp.integer_formulas
+
+            assert int_formulas == encoded_pp.variable_pool.encode_formulas(
+                encoded_pp.propositional_formulas)
+            assert list(encoded_pp.clause_arena) == int_formulas
+            assert all(0 < abs(literal) <= len(encoded_pp.variable_pool)
+                       for clause in int_formulas for literal in clause)
+
+    def test_interference_exclusion(self):
+        encoded_pp = dwr_encoder(3, exclusion='interference')
+        complete_pp = dwr_encoder(3)
+        int_formulas = encoded_pp.integer_formulas
+
+        assert int_formulas == encoded_pp.variable_pool.encode_formulas(
+            encoded_pp.propositional_formulas)
+        assert len(int_formulas) == encoded_pp.num_clauses()
+        assert len(int_formulas) < len(complete_pp.integer_formulas)
+
+        # the two robots move their containers at the same time
+        result, model = CDCL()(int_formulas)
+        plan = encoded_pp.decode_plan(model)
+        assert result is True
+        assert len(plan) == 6
+        problem = PlanningProblem("domain/dock-worker-robot-domain.pddl",
+                                  "domain/dock-worker-robot-problem.pddl")
+        state = problem.initial_state
+        for step in range(3):
+            acts = [act for act, act_step in plan if act_step == str(step)]
+            for act in acts:
+                assert act.precondition_pos <= state
+                for other in acts:
+                    if other is not act:
+                        assert not act.effect_neg & (
+                            other.precondition_pos | other.effect_pos)
+            for act in acts:
+                state = state - act.effect_neg
+            for act in acts:
+                state = state | act.effect_pos
+        assert problem.goal_state <= state
+
+    def test_unknown_exclusion(self):
+        with pytest.raises(ValueError):
+            PlanningProblemEncoder("domain/simple-domain.pddl",
+                                   "domain/simple-problem.pddl",
+                                   exclusion='none')
+
+    def test_iter_clauses(self):
+        encoded_pp = dwr_encoder(3, direct=True)
+        clauses = list(encoded_pp.iter_clauses())
+
+        assert sorted(clauses) == sorted(encoded_pp.integer_formulas)
+        assert len(clauses) == encoded_pp.num_clauses()
+        assert clauses[:len(encoded_pp.initial_formulas())] == \
+            encoded_pp.initial_formulas()
+        goals = encoded_pp.goal_literals(3)
+        assert clauses[-len(goals):] == [[goal] for goal in goals]
+
+        longer = list(encoded_pp.iter_clauses(5))
+        assert len(longer) == encoded_pp.num_clauses(5)
+        assert all(abs(literal) <= len(encoded_pp.variable_pool)
+                   for clause in longer for literal in clause)
+
+    def test_step_template(self):
+        encoded_pp = dwr_encoder(3, direct=True)
+        template = list(encoded_pp.step_template)
+        offset = encoded_pp.step_offset
+
+        assert encoded_pp.step_formulas(0) == template
+        assert encoded_pp.step_formulas(2) == [
+            [literal + 2 * offset if literal > 0 else literal - 2 * offset
+             for literal in clause] for clause in template]
+        assert max(abs(literal) for clause in template
+                   for literal in clause) <= 2 * offset
+
+    def test_incremental_formulas(self):
+        encoded_pp = PlanningProblemEncoder("domain/simple-domain.pddl",
+                                            "domain/simple-problem.pddl")
+        incremental_pp = PlanningProblemEncoder("domain/simple-domain.pddl",
+                                                "domain/simple-problem.pddl",
+                                                0)
+        int_formulas = incremental_pp.initial_formulas() + \
+            [[goal] for goal in incremental_pp.goal_literals(1)] + \
+            incremental_pp.step_formulas(0)
+
+        assert sorted(int_formulas) == sorted(encoded_pp.integer_formulas)
+
+    def test_action_variables(self):
+        encoded_pp = PlanningProblemEncoder("domain/simple-domain.pddl",
+                                            "domain/simple-problem.pddl", 2)
+        pool = encoded_pp.variable_pool
+        for step in range(2):
+            variables = encoded_pp.action_variables(step)
+
+            assert variables
+            assert all(pool.atom(var)[-1] == str(step) for var in variables)
+        assert set(encoded_pp.action_variables(0)).isdisjoint(
+            encoded_pp.action_variables(1))
+
+
+class TestVariablePool:
+
+    def test_literals(self):
+        pool = VariablePool()
+        pos = pool.literal(('atl', 'rob', 'loc1', '0'))
+        neg = pool.literal(('not', 'atl', 'rob', 'loc1', '0'))
+        act = pool.literal((Op('move', {'?r': 'rob'}), '0'))
+        assert pos == 1 and neg == -1 and act == 2
+        assert pool.fluent(-1) == ('not', 'atl', 'rob', 'loc1', '0')
+        assert pool.atom(-2) == (Op('move', {'?r': 'rob'}), '0')
+        assert pool.decode({1, -2}) == {('atl', 'rob', 'loc1', '0'),
+                                        ('not', Op('move', {'?r': 'rob'}),
+                                         '0')}
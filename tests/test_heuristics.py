@@ -0,0 +1,42 @@
+from planning_sat.heuristics import ActivityHeap, VSIDS, EVSIDS
+
+
+class TestActivityHeap:
+
+    def test_pop_order(self):
+        heap = ActivityHeap(5)
+        heap.increase(3, 2.0)
+        heap.increase(5, 1.0)
+        heap.increase(2, 3.0)
+
+        assert [heap.pop() for _ in range(3)] == [2, 3, 5]
+        assert 2 not in heap
+        heap.push(2)
+        assert 2 in heap
+        assert heap.pop() == 2
+        assert len(heap) == 2
+
+
+class TestVSIDS:
+
+    def test_pick_skips_assigned(self):
+        order = VSIDS()
+        order.reset(3)
+        order.bump(3)
+        order.bump(2)
+        order.bump(2)
+        assigns = [0, 0, 1, 0]
+
+        assert order.pick(assigns) == 3
+        order.unassigned([2, 3])
+        assigns[2] = 0
+        assert order.pick(assigns) == 2
+
+    def test_evsids_prefers_recent_conflicts(self):
+        order = EVSIDS(decay=0.5)
+        order.reset(2)
+        order.bump(1)
+        order.decay()
+        order.bump(2)
+
+        assert order.pick([0, 0, 0]) == 2
@@ -61,3 +61,21 @@ class TestPlanningProblem:
         pp = PlanningProblem("domain/dock-worker-robot-domain.pddl",
                              "domain/dock-worker-robot-problem.pddl")
         assert set(pp.fluents) == set(fluents)
+
+    def test_action_indexes(self):
+        pp = PlanningProblem("domain/dock-worker-robot-domain.pddl",
+                             "domain/dock-worker-robot-problem.pddl")
+        actions = pp.actions
+
+        assert set(pp.adders) >= set(fluents)
+        for fluent in fluents:
+            assert pp.adders[fluent] == [
+                index for index, act in enumerate(actions)
+                if fluent in act.effect_pos]
+            assert pp.deleters[fluent] == [
+                index for index, act in enumerate(actions)
+                if fluent in act.effect_neg]
+            assert pp.requirers[fluent] == [
+                index for index, act in enumerate(actions)
+                if fluent in act.precondition_pos]
+        assert pp.requirers[("adjacent", "loc1", "loc2")]
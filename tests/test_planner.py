@@ -0,0 +1,85 @@
+from planning_sat.budget import UNKNOWN
+from planning_sat.planner import Planner, SCHEDULES
+
+
+class ScriptedSolver(object):
+    # stands in for the CDCL solver of a horizon, with a fixed answer
+
+    def __init__(self, result):
+        self._result = result
+
+    def solve(self, assumptions=(), budget=None):
+        return self._result, None
+
+
+class ScriptedPlanner(Planner):
+    # horizon 2 never decides within its budget, horizon 3 is unsatisfiable
+
+    def _horizon_solver(self, length: int):
+        return ScriptedSolver({2: UNKNOWN, 3: False}.get(length, UNKNOWN))
+
+
+class TestPlanner:
+
+    def test_sequential(self):
+        planner = Planner("domain/dock-worker-robot-domain.pddl",
+                          "domain/dock-worker-robot-problem.pddl")
+        plan, timings = planner()
+
+        assert len(plan) == 6
+        assert [int(step) for _, step in plan] == list(range(6))
+        assert sorted(timings) == list(range(7))
+        assert timings[6]['result']
+        assert not any(timings[length]['result'] for length in range(6))
+
+    def test_parallel_plan(self):
+        planner = Planner("domain/dock-worker-robot-domain.pddl",
+                          "domain/dock-worker-robot-problem.pddl",
+                          exclusion='interference')
+        plan, timings = planner()
+
+        assert len(plan) == 6
+        assert sorted(timings) == list(range(4))
+        assert timings[3]['result']
+
+    def test_schedules(self):
+        for schedule in SCHEDULES:
+            planner = Planner("domain/dock-worker-robot-domain.pddl",
+                              "domain/dock-worker-robot-problem.pddl",
+                              schedule, max_length=20)
+            plan, timings = planner()
+
+            found = [length for length, timing in timings.items()
+                     if timing['result']]
+            assert len(found) == 1 and found[0] >= 6
+            assert plan is not None
+            assert 6 <= len(plan) <= found[0]
+
+    def test_shorter_horizons_ruled_out(self):
+        planner = ScriptedPlanner("domain/dock-worker-robot-domain.pddl",
+                                  "domain/dock-worker-robot-problem.pddl",
+                                  'rintanen-c', max_length=3)
+        plan, timings = planner()
+
+        assert plan is None
+        assert [timings[length]['result'] for length in range(4)] == \
+            [False] * 4
+
+    def test_no_plan(self):
+        planner = Planner("domain/dock-worker-robot-domain.pddl",
+                          "domain/dock-worker-robot-problem.pddl",
+                          max_length=3)
+        plan, timings = planner()
+
+        assert plan is None
+        assert sorted(timings) == [0, 1, 2, 3]
+
+    def test_time_limit(self):
+        for schedule in SCHEDULES:
+            planner = Planner("domain/dock-worker-robot-domain.pddl",
+                              "domain/dock-worker-robot-problem.pddl",
+                              schedule, time_limit=0)
+            plan, timings = planner()
+
+            assert plan is None
+            assert not any(timing['result'] for timing in timings.values())
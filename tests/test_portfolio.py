@@ -0,0 +1,43 @@
+from planning_sat.budget import Budget, UNKNOWN
+from planning_sat.cdcl import CDCL
+from planning_sat.portfolio import Portfolio
+from tests.helpers import DWR_HORIZONS, dwr_encoder, pigeonhole, satisfies
+
+
+class TestPortfolio:
+
+    def test_configurations(self):
+        configurations = Portfolio(workers=8).configurations
+
+        assert len(configurations) == 8
+        assert [configuration['seed'] for configuration in configurations] \
+            == list(range(8))
+        assert configurations[0]['heuristic'] != \
+            configurations[2]['heuristic']
+
+    def test_seeded_cdcl(self):
+        formulas = pigeonhole(5)
+        for seed in range(3):
+            result, model = CDCL(seed=seed, random_frequency=0.5)(formulas)
+
+            assert result is False
+
+    def test_planning_horizon(self):
+        for length, expected in DWR_HORIZONS:
+            encoded_pp = dwr_encoder(length)
+            formulas = encoded_pp.integer_formulas
+            portfolio = Portfolio(workers=3)
+            result, final_model = portfolio(formulas)
+
+            assert result == expected
+            assert portfolio.winner in portfolio.configurations
+            if result:
+                assert satisfies(formulas, final_model)
+                assert len(encoded_pp.decode_plan(final_model)) >= 6
+
+    def test_time_limit(self):
+        result, model = Portfolio(workers=2)(pigeonhole(10),
+                                             budget=Budget(time_limit=0.2))
+
+        assert result is UNKNOWN
+        assert model is None
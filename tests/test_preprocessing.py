@@ -0,0 +1,87 @@
+from planning_sat.cdcl import CDCL
+from planning_sat.preprocessing import Preprocessor
+from tests.helpers import dwr_formulas, satisfies
+
+
+class TestPreprocessor:
+
+    def test_subsumption(self):
+        preprocessor = Preprocessor(self_subsumption=False,
+                                    variable_elimination=False)
+        simplified = preprocessor([[1, 2], [1, 2, 3], [-1, 2, 4], [1, 2, 4]])
+
+        assert sorted(simplified) == [[-1, 2, 4], [1, 2]]
+
+    def test_clause_generator(self):
+        simplified = Preprocessor()(clause for clause in [[1], [-1]])
+
+        assert simplified == [[]]
+
+    def test_self_subsumption(self):
+        preprocessor = Preprocessor(variable_elimination=False)
+        simplified = preprocessor([[1, 2], [-1, 2, 3], [3, 4, 5]])
+
+        assert sorted(simplified) == [[1, 2], [2, 3], [3, 4, 5]]
+
+    def test_variable_elimination(self):
+        preprocessor = Preprocessor()
+        formulas = [[1, 2], [-1, 3], [-2, -3, 4], [-4, 2]]
+        simplified = preprocessor(formulas, frozen=[4])
+
+        assert 4 not in preprocessor.eliminated
+        result, model = CDCL()(simplified)
+        assert result
+        assert satisfies(formulas, preprocessor.extend(model))
+
+    def test_failed_literal_probing(self):
+        # 1 implies both 2 and not 2
+        preprocessor = Preprocessor(probing=True, subsumption=False,
+                                    self_subsumption=False,
+                                    variable_elimination=False)
+        simplified = preprocessor([[-1, 2], [-1, 3], [-2, -3, 4],
+                                   [-4, -2, 5], [-5, -2, 6], [-6, -1]])
+
+        assert [-1] in simplified
+        assert preprocessor.statistics['probing']['removed_clauses'] > 0
+
+    def test_equivalent_literals(self):
+        preprocessor = Preprocessor(equivalences=True, subsumption=False,
+                                    self_subsumption=False,
+                                    variable_elimination=False)
+        formulas = [[-1, 2], [-2, 3], [-3, 1], [1, 4, 5], [-3, -4, 5]]
+        simplified = preprocessor(formulas, frozen=[3])
+
+        assert preprocessor.eliminated == {1, 2}
+        assert sorted(simplified) == [[-3, -4, 5], [3, 4, 5]]
+        result, model = CDCL()(simplified + [[-3]])
+        model = preprocessor.extend(model)
+        assert satisfies(formulas, model)
+        assert -1 in model and -2 in model
+
+    def test_pure_literals(self):
+        preprocessor = Preprocessor(pure_literals=True, subsumption=False,
+                                    self_subsumption=False,
+                                    variable_elimination=False)
+        # 3 is pure, and without its clauses so is 1
+        formulas = [[1, 3], [-2, 3, 4], [1, 2], [-4, 2], [4, -2]]
+        simplified = preprocessor(formulas, frozen=[4])
+
+        assert preprocessor.eliminated == {1, 3}
+        assert sorted(simplified) == [[-2, 4], [2, -4]]
+        result, model = CDCL()(simplified)
+        assert satisfies(formulas, preprocessor.extend(model))
+
+    def test_unsatisfiable(self):
+        preprocessor = Preprocessor()
+
+        assert preprocessor([[1, 2], [-1, 2], [1, -2], [-1, -2]]) == [[]]
+
+    def test_planning_formulas(self):
+        formulas = dwr_formulas(6)
+        preprocessor = Preprocessor()
+        simplified = preprocessor(formulas)
+
+        assert len(simplified) < len(formulas)
+        result, model = CDCL()(simplified)
+        assert result
+        assert satisfies(formulas, preprocessor.extend(model))
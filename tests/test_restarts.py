@@ -0,0 +1,36 @@
+from planning_sat.restarts import luby, LubyRestarts, GlucoseRestarts
+
+
+class TestLuby:
+
+    def test_sequence(self):
+        expected = [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+        assert [luby(i) for i in range(len(expected))] == expected
+
+    def test_schedule(self):
+        restarts = LubyRestarts(unit=2)
+        restarts.reset()
+        intervals = []
+        for _ in range(3):
+            conflicts = 0
+            while not restarts.should_restart():
+                restarts.on_conflict(1)
+                conflicts += 1
+            restarts.on_restart()
+            intervals.append(conflicts)
+        assert intervals == [2, 2, 4]
+
+
+class TestGlucoseRestarts:
+
+    def test_restart_on_bad_clauses(self):
+        restarts = GlucoseRestarts(window=3, margin=0.8)
+        restarts.reset()
+        for lbd in (2, 2, 2, 2, 2, 2):
+            restarts.on_conflict(lbd)
+        assert not restarts.should_restart()
+        for lbd in (9, 9, 9):
+            restarts.on_conflict(lbd)
+        assert restarts.should_restart()
+        restarts.on_restart()
+        assert not restarts.should_restart()
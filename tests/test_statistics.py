@@ -0,0 +1,66 @@
+from planning_sat.budget import Budget
+from planning_sat.cdcl import CDCL
+from planning_sat.davis_putnam import DavisPutnam
+from planning_sat.statistics import SolverStatistics
+from tests.helpers import dwr_formulas, pigeonhole
+
+
+class TestStatistics:
+
+    def test_counters(self):
+        statistics = SolverStatistics()
+        statistics.propagations = 50
+        statistics.time = 0.5
+
+        assert statistics.propagations_per_second == 100
+        assert statistics.as_dict()['propagations_per_second'] == 100
+        assert SolverStatistics().propagations_per_second == 0
+
+    def test_solver_statistics(self):
+        for solver in (CDCL(), CDCL('evsids', 'glucose'), DavisPutnam()):
+            result, _ = solver(dwr_formulas(6))
+            statistics = solver.statistics
+
+            assert result
+            assert statistics.decisions > 0
+            assert statistics.propagations > statistics.decisions
+            assert statistics.max_decision_level <= statistics.decisions
+            assert statistics.time > 0
+
+    def test_budget_counts(self):
+        solver = CDCL()
+        solver(pigeonhole(7), budget=Budget(conflicts=10))
+
+        assert solver.statistics.conflicts == 11
+        assert solver.statistics.learned_clauses == 10
+
+    def test_progress(self):
+        reports = []
+        solver = CDCL(progress=lambda statistics: reports.append(
+            (statistics.conflicts, statistics.decisions,
+             statistics.propagations)), progress_interval=5)
+        solver(pigeonhole(6))
+        conflicts = solver.statistics.conflicts
+        decisions = solver.statistics.decisions
+
+        assert all(count % 5 == 0 or decided % 5 == 0
+                   for count, decided, _ in reports)
+        assert set(range(5, conflicts + 1, 5)) <= \
+            set(count for count, _, _ in reports)
+        assert set(range(5, decisions + 1, 5)) <= \
+            set(decided for _, decided, _ in reports)
+        assert [propagations for _, _, propagations in reports] == \
+            sorted(propagations for _, _, propagations in reports)
+        assert solver.statistics.restarts > 0
+        assert solver.statistics.learned_clauses > 0
+
+    def test_progress_without_conflicts(self):
+        # satisfiable without a single conflict, reported by decisions
+        reports = []
+        solver = DavisPutnam(progress=lambda statistics: reports.append(
+            statistics.decisions), progress_interval=2)
+        result, _ = solver([[var, var + 1] for var in range(1, 20, 2)])
+
+        assert result
+        assert solver.statistics.conflicts == 0
+        assert reports == list(range(2, solver.statistics.decisions + 1, 2))